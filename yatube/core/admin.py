@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'queue', 'task', 'status', 'attempts', 'run_at')
+    list_filter = ('queue', 'status')
+    readonly_fields = ('created', 'locked_by', 'locked_until', 'last_error')
+    empty_value_display = '-пусто-'
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import apply_pragmas
+        from .replication import track_writes
+        connection_created.connect(apply_pragmas)
+        connection_created.connect(track_writes)
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(name=None):
+    """
+    Временная БД для бенчмарков, создаётся так же, как тестовая:
+    рабочая база не затрагивается. name — путь к файлу SQLite,
+    по умолчанию база в памяти.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    test_settings['NAME'] = name
+    try:
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+
+
+def measure(func, repeat=5):
+    """ Время выполнения func в секундах для каждого из repeat запусков """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return timings
+
+
+def percentile(values, percent):
+    """ Перцентиль по методу ближайшего ранга """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = round(percent / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+def ms(seconds):
+    return f'{seconds * 1000:.2f}'
@@ -0,0 +1,125 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+POLL_INTERVAL = 0.05
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _is_fresh(entry, version):
+    _, entry_version, fresh_until = entry
+    return entry_version == version and time.time() < fresh_until
+
+
+def _store(cache, values, timeout, stale_timeout):
+    fresh_until = time.time() + timeout
+    cache.set_many(
+        {
+            key: (value, version, fresh_until)
+            for key, (value, version) in values.items()
+        },
+        timeout + stale_timeout,
+    )
+
+
+def get_many_or_compute(computations, timeout, stale_timeout=None,
+                        lock_timeout=None, cache=None):
+    """
+    Значения для нескольких ключей с защитой от «набега» на кэш.
+
+    computations — {ключ: (версия, функция)}. Свежее значение (та же
+    версия, не истёк timeout) отдаётся сразу. Для устаревшего или
+    отсутствующего пересчёт выполняет только тот, кто взял блокировку;
+    остальные отдают прежнее значение (stale-while-revalidate), а если
+    его нет — ждут результата. Функция, вернувшая None, ничего не
+    кэширует. Возвращает {ключ: значение}.
+    """
+    cache = cache or default_cache
+    if stale_timeout is None:
+        stale_timeout = settings.CACHE_STALE_TIMEOUT
+    if lock_timeout is None:
+        lock_timeout = settings.CACHE_LOCK_TIMEOUT
+    entries = cache.get_many(list(computations))
+    result = {}
+    locked = []
+    waiting = []
+    for key, (version, _) in computations.items():
+        entry = entries.get(key)
+        if entry is not None and _is_fresh(entry, version):
+            result[key] = entry[0]
+        elif cache.add(_lock_key(key), uuid.uuid4().hex, lock_timeout):
+            locked.append(key)
+        elif entry is not None:
+            result[key] = entry[0]
+        else:
+            waiting.append(key)
+    if locked:
+        result.update(_compute(
+            cache, {key: computations[key] for key in locked},
+            timeout, stale_timeout,
+        ))
+    if waiting:
+        result.update(_wait(
+            cache, {key: computations[key] for key in waiting},
+            timeout, stale_timeout, lock_timeout,
+        ))
+    return result
+
+
+def get_or_compute(key, version, compute, timeout, **kwargs):
+    """ get_many_or_compute для одного ключа """
+    return get_many_or_compute(
+        {key: (version, compute)}, timeout, **kwargs)[key]
+
+
+def _run(cache, key, computation, timeout, stale_timeout):
+    version, compute = computation
+    value = compute()
+    if value is not None:
+        _store(cache, {key: (value, version)}, timeout, stale_timeout)
+    return value
+
+
+def _compute(cache, computations, timeout, stale_timeout):
+    """ Пересчёт под блокировками; результат сохраняется одним set_many """
+    try:
+        values = {
+            key: (compute(), version)
+            for key, (version, compute) in computations.items()
+        }
+        _store(
+            cache,
+            {key: item for key, item in values.items() if item[0] is not None},
+            timeout, stale_timeout,
+        )
+        return {key: value for key, (value, _) in values.items()}
+    finally:
+        cache.delete_many([_lock_key(key) for key in computations])
+
+
+def _wait(cache, computations, timeout, stale_timeout, lock_timeout):
+    """ Ждёт, пока пересчёт завершит держатель блокировки """
+    result = {}
+    deadline = time.time() + lock_timeout
+    while computations and time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entries = cache.get_many(list(computations))
+        locks = cache.get_many([_lock_key(key) for key in computations])
+        for key in list(computations):
+            if key in entries:
+                result[key] = entries[key][0]
+                del computations[key]
+            elif _lock_key(key) not in locks:
+                # Блокировку отпустили без значения — считаем сами
+                result[key] = _run(
+                    cache, key, computations.pop(key),
+                    timeout, stale_timeout,
+                )
+    for key, computation in computations.items():
+        result[key] = _run(cache, key, computation, timeout, stale_timeout)
+    return result
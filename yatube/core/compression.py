@@ -0,0 +1,120 @@
+import gzip
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Уровни для ответов на лету: почти то же сжатие, что на максимуме,
+# при в разы меньшей цене
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'application/rss+xml', 'application/atom+xml',
+    'image/svg+xml',
+)
+
+
+def gzip_bytes(data, level=GZIP_LEVEL):
+    # mtime=0: одинаковое содержимое — одинаковые байты
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_bytes(data, quality=BROTLI_QUALITY):
+    return brotli.compress(data, quality=quality)
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+# Кодировка → (сжать байты, сжать поток) в порядке предпочтения
+CODECS = {'gzip': (gzip_bytes, compress_sequence)}
+if brotli is not None:
+    CODECS = {'br': (brotli_bytes, _brotli_sequence), **CODECS}
+
+
+def accepted_encodings(request):
+    """ Кодировки из Accept-Encoding, кроме явно запрещённых q=0 """
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().lower().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(coding.strip())
+    return accepted
+
+
+def _compressed_key(response, encoding):
+    """
+    Ключ сжатого тела по самому телу: ETag его не задаёт однозначно —
+    устаревшая страница ленты может уйти с тем же ETag, что и новая.
+    """
+    digest = md5(response.content)
+    digest.update(response['Content-Type'].encode())
+    return f'compressed:{encoding}:{digest.hexdigest()}'
+
+
+def _cacheable(request, response):
+    # Кэшируются только страницы с ETag — повторяющиеся; тело с токеном
+    # CSRF у каждого своё
+    return (
+        response.has_header('ETag')
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def compress_response(request, response):
+    """
+    Сжимает ответ лучшей из принятых клиентом кодировок. Сжатые тела
+    ответов с ETag хранятся в кэше: горячие страницы не сжимаются
+    заново. Потоковые ответы сжимаются по частям.
+    """
+    content_type = response.get('Content-Type', '')
+    if (response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)):
+        return response
+    if (not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    accepted = accepted_encodings(request)
+    encoding = next((name for name in CODECS if name in accepted), None)
+    if encoding is None:
+        return response
+    compress_bytes, compress_stream = CODECS[encoding]
+    if response.streaming:
+        response.streaming_content = compress_stream(
+            response.streaming_content)
+        del response['Content-Length']
+    else:
+        cacheable = _cacheable(request, response)
+        key = _compressed_key(response, encoding) if cacheable else None
+        compressed = cache.get(key) if cacheable else None
+        if compressed is None:
+            compressed = compress_bytes(response.content)
+            if cacheable:
+                cache.set(
+                    key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+    # Сжатое тело не побайтно равно исходному: ETag становится слабым
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    response['Content-Encoding'] = encoding
+    return response
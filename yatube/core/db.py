@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Обработчик connection_created: PRAGMA профиля базы для нового
+    соединения SQLite. Выполняются мимо курсора Django, чтобы не
+    попадать в счётчики запросов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Как часто процесс проверяет, не пора ли освободить место, секунды
+CULL_INTERVAL = 10
+
+
+class SharedFileCache(FileBasedCache):
+    """
+    Файловый кэш, общий для всех процессов WSGI и команд на машине.
+    В отличие от FileBasedCache, add() атомарен между процессами — на
+    нём держатся блокировки пересчёта core.cache, — а каталог
+    пересчитывается не при каждой записи, а не чаще CULL_INTERVAL.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._next_cull = 0
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        fname = self._key_to_file(key, version)
+        self._createdir()
+        self._cull()
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as stream:
+                self._write_content(stream, timeout, value)
+            # Вторая попытка — если мешал файл с истёкшим сроком:
+            # has_key() его удаляет
+            for _ in range(2):
+                try:
+                    # В отличие от rename(), link() не заменяет файл
+                    os.link(tmp_path, fname)
+                    return True
+                except FileExistsError:
+                    if self.has_key(key, version):
+                        return False
+            return False
+        finally:
+            os.remove(tmp_path)
+
+    def _cull(self):
+        now = time.monotonic()
+        if now < self._next_cull:
+            return
+        self._next_cull = now + CULL_INTERVAL
+        super()._cull()
@@ -0,0 +1,148 @@
+import json
+import traceback
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from importlib import import_module
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+TASKS = {}
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def task(queue='default', batch=False):
+    """
+    Регистрирует функцию как фоновую задачу: func.enqueue(**payload)
+    ставит её в очередь. При batch=True исполнитель вызывает функцию
+    один раз со списком payload всех взятых задач — например, чтобы
+    отправить пачку писем за одно соединение.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.queue = queue
+        func.batch = batch
+        func.enqueue = partial(enqueue, func)
+        TASKS[func.task_name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, delay=0, **payload):
+    """
+    Ставит задачу в очередь. Строка пишется в той же транзакции, что
+    и остальные изменения запроса: откат отменяет и задачу.
+    """
+    return Job.objects.create(
+        queue=func.queue,
+        task=func.task_name,
+        payload=json.dumps(payload, cls=DjangoJSONEncoder),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def resolve(name):
+    """ Зарегистрированная задача по имени; модуль импортируется сам """
+    if name not in TASKS:
+        module, _, _ = name.rpartition('.')
+        try:
+            import_module(module)
+        except ImportError:
+            pass
+    if name not in TASKS:
+        raise UnknownTask(name)
+    return TASKS[name]
+
+
+def claim(worker, queues=None, limit=None):
+    """
+    Берёт до limit готовых задач одним UPDATE: исполнители не могут
+    взять одну задачу дважды. Задачи упавшего исполнителя снова
+    доступны после JOBS_LEASE секунд.
+    """
+    now = timezone.now()
+    token = f'{worker}:{uuid.uuid4().hex}'
+    due = Job.objects.filter(
+        Q(status=Job.PENDING, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    if queues:
+        due = due.filter(queue__in=queues)
+    ids = due.order_by('run_at', 'id').values('id')[
+        :limit or settings.JOBS_BATCH_SIZE]
+    Job.objects.filter(pk__in=ids).update(
+        status=Job.RUNNING,
+        locked_by=token,
+        locked_until=now + timedelta(seconds=settings.JOBS_LEASE),
+        attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(locked_by=token).order_by('run_at', 'id'))
+
+
+def retry_delay(attempts):
+    """ Экспоненциальная пауза перед следующей попыткой, секунды """
+    return min(
+        settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_MAX_DELAY,
+    )
+
+
+def _finish(jobs, error=None):
+    """ Удачные задачи удаляются, неудачные ждут повтора или падают """
+    if error is None:
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        return
+    now = timezone.now()
+    for job in jobs:
+        job.last_error = error
+        job.locked_by = ''
+        job.locked_until = None
+        if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.PENDING
+            job.run_at = now + timedelta(seconds=retry_delay(job.attempts))
+        job.save(update_fields=(
+            'status', 'run_at', 'last_error', 'locked_by', 'locked_until'))
+
+
+def run_jobs(jobs):
+    """
+    Выполняет взятые задачи: пакетные — одним вызовом на задачу,
+    остальные — по одной. Возвращает [(задача, удалась ли)].
+    """
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job.task].append(job)
+    results = []
+    for name, group in groups.items():
+        try:
+            func = resolve(name)
+        except UnknownTask:
+            _finish(group, f'Неизвестная задача: {name}')
+            results.extend((job, False) for job in group)
+            continue
+        batches = [group] if func.batch else [[job] for job in group]
+        for batch in batches:
+            payloads = [json.loads(job.payload) for job in batch]
+            try:
+                if func.batch:
+                    func(payloads)
+                else:
+                    func(**payloads[0])
+            except Exception:
+                _finish(batch, traceback.format_exc())
+                results.extend((job, False) for job in batch)
+            else:
+                _finish(batch)
+                results.extend((job, True) for job in batch)
+    return results
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.mail import (
+    EmailMessage, EmailMultiAlternatives, get_connection
+)
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .jobs import task
+
+MESSAGE_FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'extra_headers',
+)
+
+
+def serialize_message(message):
+    if message.attachments:
+        raise ValueError('Вложения в очереди писем не поддерживаются')
+    data = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    data['alternatives'] = getattr(message, 'alternatives', [])
+    return data
+
+
+def deserialize_message(data):
+    alternatives = data.pop('alternatives')
+    if alternatives:
+        return EmailMultiAlternatives(
+            headers=data.pop('extra_headers'), alternatives=alternatives,
+            **data)
+    return EmailMessage(headers=data.pop('extra_headers'), **data)
+
+
+@task(queue='email', batch=True)
+def send_emails(payloads):
+    """ Все письма взятых задач — за одно соединение JOBS_EMAIL_BACKEND """
+    messages = [
+        deserialize_message(data)
+        for payload in payloads
+        for data in payload['messages']
+    ]
+    with get_connection(settings.JOBS_EMAIL_BACKEND) as connection:
+        connection.send_messages(messages)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Запрос не ждёт почты: письма ставятся в очередь 'email' и уходят
+    из manage.py run_worker через JOBS_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        messages = [serialize_message(message) for message in email_messages]
+        if messages:
+            send_emails.enqueue(messages=messages)
+        return len(messages)
@@ -0,0 +1,55 @@
+from statistics import median
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.bench import benchmark_database, measure, ms
+from core.middleware import QueryTimer
+
+User = get_user_model()
+MODES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend'],
+    },
+    'cached': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['core.auth.CachedModelBackend'],
+    },
+}
+URLS = ('posts:post_create', 'users:password_change_form', 'about:author')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сколько SQL-запросов и времени тратит авторизованный запрос '
+        'на сессию и пользователя: сессии в базе и ModelBackend против '
+        'cached_db и CachedModelBackend.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"url":>28} {"mode":>7} {"queries":>8} {"p50, ms":>8}')
+        for mode, overrides in MODES.items():
+            with override_settings(**overrides), benchmark_database():
+                user = User.objects.create_user(username='bench')
+                client = Client(HTTP_HOST='localhost')
+                client.force_login(user)
+                for name in URLS:
+                    url = reverse(name)
+                    client.get(url)
+                    timer = QueryTimer()
+                    with connection.execute_wrapper(timer):
+                        client.get(url)
+                    seconds = median(measure(
+                        lambda: client.get(url), options['requests']))
+                    self.stdout.write(
+                        f'{name:>28} {mode:>7} {timer.queries:>8} '
+                        f'{ms(seconds):>8}')
@@ -0,0 +1,129 @@
+import os
+import random
+import tempfile
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from django.test import override_settings
+
+from core.bench import benchmark_database, ms, percentile
+from posts.models import Group, Post, User
+from posts.queries import feed_posts
+from posts.seeding import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили соединений с SQLite из DATABASE_PROFILES: '
+        'читатели листают ленты, писатели создают посты, все '
+        'одновременно. Печатает чтения и записи в секунду, p95 и '
+        'число ошибок «database is locked».'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(settings.DATABASE_PROFILES),
+            help='Какие профили сравнить.')
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность прогона каждого профиля.')
+        parser.add_argument('--posts', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        unknown = set(options['profiles']) - set(settings.DATABASE_PROFILES)
+        if unknown:
+            raise CommandError(
+                'Неизвестные профили: ' + ', '.join(sorted(unknown)))
+        self.stdout.write(
+            f'{"profile":>12} {"reads/s":>9} {"read p95":>9} '
+            f'{"writes/s":>9} {"write p95":>9} {"errors":>6}')
+        for name in options['profiles']:
+            result = self.run_profile(
+                settings.DATABASE_PROFILES[name], options)
+            self.stdout.write(
+                f'{name:>12} {result["reads"]:>9.0f} '
+                f'{ms(result["read_p95"]):>9} {result["writes"]:>9.0f} '
+                f'{ms(result["write_p95"]):>9} {result["errors"]:>6}')
+
+    def run_profile(self, profile, options):
+        """ Прогон на своей временной файловой базе с PRAGMA профиля """
+        max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+        connection.settings_dict['CONN_MAX_AGE'] = profile['CONN_MAX_AGE']
+        try:
+            with override_settings(SQLITE_PRAGMAS=profile['PRAGMAS']):
+                with tempfile.TemporaryDirectory() as directory:
+                    with benchmark_database(
+                            os.path.join(directory, 'bench.db')):
+                        seed_dataset(
+                            users=100, groups=10, posts=options['posts'])
+                        return self.load(options)
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+
+    def load(self, options):
+        authors = list(User.objects.values_list('pk', flat=True))
+        groups = list(Group.objects.values_list('pk', flat=True))
+        timings = {'read': [], 'write': []}
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(
+            options['readers'] + options['writers'] + 1)
+        stop = threading.Event()
+
+        def read(rng):
+            posts = feed_posts(group_id=rng.choice(groups))
+            offset = rng.randrange(5) * settings.POSTS_PER_PAGE
+            list(posts[offset:offset + settings.POSTS_PER_PAGE])
+
+        def write(rng):
+            Post.objects.create(
+                author_id=rng.choice(authors), group_id=rng.choice(groups),
+                text='Пост из нагрузочного теста')
+
+        def worker(kind, operation, number):
+            rng = random.Random(number)
+            local, failed = [], 0
+            barrier.wait()
+            while not stop.is_set():
+                start = perf_counter()
+                try:
+                    operation(rng)
+                    local.append(perf_counter() - start)
+                except OperationalError:
+                    failed += 1
+                # Как после запроса: при CONN_MAX_AGE=0 соединение
+                # закрывается и следующее открывается заново
+                close_old_connections()
+            connection.close()
+            with lock:
+                timings[kind].extend(local)
+                errors.append(failed)
+
+        threads = [
+            threading.Thread(target=worker, args=('read', read, number))
+            for number in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('write', write, -number))
+            for number in range(1, options['writers'] + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = perf_counter()
+        stop.wait(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - start
+        return {
+            'reads': len(timings['read']) / elapsed,
+            'read_p95': percentile(timings['read'], 95),
+            'writes': len(timings['write']) / elapsed,
+            'write_p95': percentile(timings['write'], 95),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import replica_aliases, sync_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу во все реплики из DATABASE_REPLICAS '
+        'через online backup API SQLite: один раз или каждые '
+        '--interval секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true', help='Одна копия и выход.')
+        parser.add_argument(
+            '--interval', type=float, default=settings.REPLICA_SYNC_INTERVAL,
+            help='Пауза между копиями, секунды.')
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError(
+                'Реплик нет: задайте DATABASE_REPLICAS, пути через '
+                'двоеточие.')
+        while True:
+            for alias in aliases:
+                started = time.time()
+                sync_replica(alias)
+                if options['once'] or options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'{alias}: {time.time() - started:.2f} с')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
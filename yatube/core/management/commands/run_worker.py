@@ -0,0 +1,81 @@
+import os
+import socket
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+
+from core.jobs import claim, run_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Исполнитель фоновых задач: берёт готовые задачи из таблицы '
+        'core_job пачками, повторяет упавшие с растущей паузой и '
+        'печатает пропускную способность по очередям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queues', nargs='+', help='Только эти очереди.')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.JOBS_BATCH_SIZE,
+            help='Сколько задач брать за раз.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.')
+        parser.add_argument(
+            '--report-interval', type=float, default=60,
+            help='Как часто печатать статистику, секунды.')
+
+    def handle(self, *args, **options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stats = defaultdict(lambda: defaultdict(float))
+        self.reported = time.monotonic()
+        while True:
+            try:
+                jobs = claim(worker, options['queues'], options['batch_size'])
+            except OperationalError:
+                # База занята другим писателем — попробуем позже
+                jobs = []
+            if jobs:
+                self.run(jobs)
+            elif options['once']:
+                break
+            else:
+                close_old_connections()
+                time.sleep(settings.JOBS_POLL_INTERVAL)
+            if time.monotonic() - self.reported >= options['report_interval']:
+                self.report()
+        self.report()
+
+    def run(self, jobs):
+        start = time.monotonic()
+        results = run_jobs(jobs)
+        share = (time.monotonic() - start) / len(results)
+        for job, succeeded in results:
+            stats = self.stats[job.queue]
+            stats['seconds'] += share
+            if succeeded:
+                stats['done'] += 1
+            elif job.status == job.FAILED:
+                stats['failed'] += 1
+            else:
+                stats['retried'] += 1
+
+    def report(self):
+        now = time.monotonic()
+        elapsed = now - self.reported
+        for queue, stats in sorted(self.stats.items()):
+            handled = stats['done'] + stats['failed'] + stats['retried']
+            self.stdout.write(
+                f'{queue}: выполнено {stats["done"]:.0f} '
+                f'({stats["done"] / elapsed:.1f}/с), '
+                f'повторов {stats["retried"]:.0f}, '
+                f'не удалось {stats["failed"]:.0f}, '
+                f'{stats["seconds"] / max(handled, 1) * 1000:.1f} мс '
+                f'на задачу')
+        self.stats.clear()
+        self.reported = now
@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+PREFIX = 'yatube'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Поля статистики представления после корзин гистограммы
+# (последняя корзина — выше всех границ)
+COUNT, SUM, QUERIES, SQL_TIME = range(4)
+
+
+class Registry:
+    """
+    Метрики процесса по представлениям. Каждый поток пишет в свою
+    копию без блокировок; snapshot() складывает копии всех потоков.
+    Копии завершившихся потоков сливаются в общую, так что их число
+    не растёт вместе с числом созданных потоков.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.offset = len(self.buckets) + 1
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = {}
+        self._finished = {}
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._fold_finished()
+                self._shards[threading.current_thread()] = shard
+        return shard
+
+    def _fold_finished(self):
+        """ Под self._lock: завершившийся поток в свою копию не пишет """
+        for thread in [
+                thread for thread in self._shards if not thread.is_alive()]:
+            for view, stats in self._shards.pop(thread).items():
+                merge_stats(self._finished, view, stats)
+
+    def record(self, view, seconds, queries, sql_seconds):
+        stats = self._shard().get(view)
+        if stats is None:
+            stats = self._shard()[view] = [0] * (self.offset + 4)
+        stats[bisect_left(self.buckets, seconds)] += 1
+        totals = self.offset
+        stats[totals + COUNT] += 1
+        stats[totals + SUM] += seconds
+        stats[totals + QUERIES] += queries
+        stats[totals + SQL_TIME] += sql_seconds
+
+    def snapshot(self):
+        """ {представление: [корзины..., count, sum, queries, sql]} """
+        merged = {}
+        with self._lock:
+            self._fold_finished()
+            for shard in (self._finished, *self._shards.values()):
+                for view, stats in list(shard.items()):
+                    merge_stats(merged, view, stats)
+        return merged
+
+    def reset(self):
+        with self._lock:
+            self._shards.clear()
+            self._finished.clear()
+            self._local = threading.local()
+
+
+def merge_stats(merged, view, stats):
+    total = merged.setdefault(view, [0] * len(stats))
+    for index, value in enumerate(stats):
+        total[index] += value
+
+
+registry = Registry(settings.METRICS_BUCKETS)
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def write_snapshot(directory):
+    """
+    Сохраняет метрики процесса в <directory>/<pid>.json: файл
+    заменяется целиком, читатели не видят недописанных данных.
+    """
+    os.makedirs(directory, exist_ok=True)
+    data = {'buckets': registry.buckets, 'views': registry.snapshot()}
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(descriptor, 'w') as stream:
+        json.dump(data, stream)
+    os.replace(temp_path, _snapshot_path(directory, os.getpid()))
+
+
+def read_snapshots(directory):
+    """ Метрики всех процессов из каталога снимков """
+    merged = {}
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            continue
+        if tuple(data['buckets']) != registry.buckets:
+            continue
+        for view, stats in data['views'].items():
+            merge_stats(merged, view, stats)
+    return merged
+
+
+class SnapshotWriter:
+    """ Пишет снимок не чаще interval секунд; вызывается после запросов """
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.next_write = 0
+        self.lock = threading.Lock()
+
+    def maybe_write(self):
+        now = time.monotonic()
+        if now < self.next_write or not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.next_write = now + self.interval
+            write_snapshot(self.directory)
+        finally:
+            self.lock.release()
+
+
+def collect():
+    """ Метрики для выдачи: всех процессов, если включены снимки """
+    directory = settings.METRICS_SNAPSHOT_DIR
+    if not directory:
+        return registry.snapshot()
+    write_snapshot(directory)
+    return read_snapshots(directory)
+
+
+def _label(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def render_prometheus(views):
+    """ Метрики в текстовом формате Prometheus """
+    buckets = registry.buckets
+    totals = registry.offset
+    duration = f'{PREFIX}_request_duration_seconds'
+    lines = [
+        f'# HELP {duration} Время обработки запроса представлением.',
+        f'# TYPE {duration} histogram',
+    ]
+    for view in sorted(views):
+        stats = views[view]
+        label = f'view="{_label(view)}"'
+        cumulative = 0
+        for bound, count in zip(buckets, stats):
+            cumulative += count
+            lines.append(
+                f'{duration}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(
+            f'{duration}_bucket{{{label},le="+Inf"}} '
+            f'{stats[totals + COUNT]}')
+        lines.append(f'{duration}_sum{{{label}}} {stats[totals + SUM]}')
+        lines.append(f'{duration}_count{{{label}}} {stats[totals + COUNT]}')
+    for name, field, help_text in (
+        ('db_queries_total', QUERIES, 'Число SQL-запросов.'),
+        ('db_query_seconds_total', SQL_TIME, 'Суммарное время SQL.'),
+    ):
+        metric = f'{PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for view in sorted(views):
+            lines.append(
+                f'{metric}{{view="{_label(view)}"}} '
+                f'{views[view][totals + field]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,190 @@
+import mimetypes
+import os
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import accepted_encodings, compress_response
+from .metrics import SnapshotWriter, registry
+from .replication import replica_aliases
+from .routers import replica_reads
+
+UNRESOLVED = '<unresolved>'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Готовые сжатые копии в порядке предпочтения: суффикс → кодировка
+STATIC_ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class QueryTimer:
+    """ execute_wrapper: считает запросы и время SQL """
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += perf_counter() - start
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    """
+    Время ответа, число SQL-запросов и время SQL по имени
+    представления. Данные копятся в памяти процесса; при заданном
+    METRICS_SNAPSHOT_DIR периодически сохраняются в файл процесса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.writer = None
+        if settings.METRICS_SNAPSHOT_DIR:
+            self.writer = SnapshotWriter(
+                settings.METRICS_SNAPSHOT_DIR,
+                settings.METRICS_SNAPSHOT_INTERVAL,
+            )
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = perf_counter() - start
+        match = request.resolver_match
+        registry.record(
+            match.view_name if match else UNRESOLVED,
+            elapsed, timer.queries, timer.seconds,
+        )
+        if self.writer is not None:
+            self.writer.maybe_write()
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Безопасные запросы читают из реплик. После записи клиент получает
+    cookie REPLICA_PIN_COOKIE и REPLICA_PIN_SECONDS читает из основной
+    базы: например, профиль после post_create уже показывает новый пост.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        allowed = (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+        with replica_reads(allowed) as state:
+            response = self.get_response(request)
+            wrote = state.wrote
+        if wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True)
+        return response
+
+
+def static_index(root):
+    """
+    {имя: {кодировка или None: путь}} для всех файлов каталога;
+    file.css.gz — это file.css в кодировке gzip.
+    """
+    files = {}
+    for directory, _, names in os.walk(root):
+        for filename in names:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            encoding = None
+            for suffix, value in STATIC_ENCODINGS:
+                if name.endswith(suffix) and os.path.exists(
+                        path[:-len(suffix)]):
+                    name, encoding = name[:-len(suffix)], value
+                    break
+            files.setdefault(name, {})[encoding] = path
+    return files
+
+
+class StaticFilesMiddleware:
+    """
+    Раздаёт STATIC_ROOT из приложения, без отдельного веб-сервера:
+    готовый .br или .gz по Accept-Encoding, файлы с хэшем в имени —
+    с Cache-Control immutable на год, остальные — с Last-Modified.
+    Список файлов читается один раз при запуске, после
+    collectstatic процесс нужно перезапустить.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_PIPELINE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = static_index(settings.STATIC_ROOT)
+        self.immutable = set(staticfiles_storage.hashed_files.values())
+
+    def __call__(self, request):
+        path = request.path_info
+        if path.startswith(self.prefix) and request.method in ('GET', 'HEAD'):
+            name = path[len(self.prefix):]
+            if name in self.files and None in self.files[name]:
+                return self.serve(request, name, self.files[name])
+        return self.get_response(request)
+
+    def serve(self, request, name, variants):
+        accepted = accepted_encodings(request)
+        encoding = next(
+            (value for _, value in STATIC_ENCODINGS
+             if value in variants and value in accepted),
+            None,
+        )
+        path = variants[encoding]
+        stat = os.stat(path)
+        immutable = name in self.immutable
+        if not immutable and not was_modified_since(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                stat.st_mtime, stat.st_size):
+            return HttpResponseNotModified()
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        response['Content-Length'] = stat.st_size
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = (
+            IMMUTABLE if immutable
+            else f'public, max-age={settings.STATIC_MAX_AGE}')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if len(variants) > 1:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Сжимает текстовые ответы больше COMPRESSION_MIN_SIZE (brotli,
+    если установлен, иначе gzip); сжатые тела страниц с ETag берутся
+    из кэша. Статику из StaticFilesMiddleware не трогает — она уже
+    сжата.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return compress_response(request, self.get_response(request))
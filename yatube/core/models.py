@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """ Фоновая задача: выполняет manage.py run_worker """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ждёт'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не удалась'),
+    )
+
+    queue = models.CharField(verbose_name='Очередь', max_length=50)
+    task = models.CharField(verbose_name='Задача', max_length=200)
+    payload = models.TextField(verbose_name='Аргументы (JSON)')
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попыток', default=0)
+    run_at = models.DateTimeField(verbose_name='Выполнить не раньше')
+    created = models.DateTimeField(
+        verbose_name='Создана', auto_now_add=True)
+    locked_by = models.CharField(
+        verbose_name='Взята исполнителем', max_length=100, blank=True)
+    locked_until = models.DateTimeField(
+        verbose_name='Взята до', null=True, blank=True)
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'queue', 'run_at'),
+                name='job_due_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.queue}: {self.task} ({self.status})'
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_PREFIX = 'replica'
+MARKER_SUFFIX = '.synced'
+# Запросы, которые ничего не меняют в основной базе
+READ_STATEMENTS = (
+    'SELECT', 'PRAGMA', 'EXPLAIN', 'BEGIN', 'SAVEPOINT', 'RELEASE',
+    'ROLLBACK',
+)
+
+
+def replica_aliases():
+    """ Псевдонимы реплик из DATABASES: replica1, replica2, ... """
+    return [
+        alias for alias in connections.databases
+        if alias.startswith(REPLICA_PREFIX)
+    ]
+
+
+def _marker_path(alias):
+    return connections.databases[alias]['NAME'] + MARKER_SUFFIX
+
+
+def _read_time(path):
+    try:
+        with open(path) as stream:
+            return float(stream.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_time(path, moment):
+    """ Файл заменяется целиком: читатели не видят недописанной метки """
+    descriptor, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(descriptor, 'w') as stream:
+        stream.write(repr(moment))
+    os.replace(temp_path, path)
+
+
+def synced_at(alias):
+    """
+    Время начала последней удачной копии в реплику или None. Метка
+    лежит рядом с файлом реплики: её видят все процессы.
+    """
+    return _read_time(_marker_path(alias))
+
+
+def last_write_at():
+    """ Время последней зафиксированной записи в основную базу """
+    return _read_time(settings.REPLICA_LAST_WRITE_FILE) or 0
+
+
+def mark_written():
+    _write_time(settings.REPLICA_LAST_WRITE_FILE, time.time())
+
+
+def _track_write(execute, sql, params, many, context):
+    """
+    Отмечает время записи в основную базу — после COMMIT, иначе копия,
+    начатая до него, считалась бы свежей. Так отмечаются записи из
+    любого процесса: сайта, manage.py, исполнителя задач.
+    """
+    result = execute(sql, params, many, context)
+    if (replica_aliases()
+            and not sql.lstrip()[:9].upper().startswith(READ_STATEMENTS)):
+        connection = context['connection']
+        if not connection.in_atomic_block:
+            mark_written()
+        elif not any(
+                func is mark_written for _, func in connection.run_on_commit):
+            connection.on_commit(mark_written)
+    return result
+
+
+def track_writes(sender, connection, **kwargs):
+    """ connection_created: следить за записями в основную базу """
+    if (connection.alias == DEFAULT_DB_ALIAS
+            and _track_write not in connection.execute_wrappers):
+        # В начало списка: execute_wrapper() снимает обёртки с конца
+        connection.execute_wrappers.insert(0, _track_write)
+
+
+def sync_replica(alias, source=DEFAULT_DB_ALIAS):
+    """
+    Копирует основную базу в реплику через online backup API SQLite.
+    Копия согласована: все транзакции, завершённые до начала копии,
+    в ней есть. Возвращает время начала копии.
+    """
+    started = time.time()
+    primary = connections[source]
+    replica = connections[alias]
+    primary.ensure_connection()
+    replica.ensure_connection()
+    primary.connection.backup(replica.connection)
+    _write_time(_marker_path(alias), started)
+    return started
@@ -0,0 +1,63 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .replication import last_write_at, replica_aliases, synced_at
+
+_state = threading.local()
+
+
+def fresh_replicas():
+    """ Реплики, скопированные после последней записи в основную базу """
+    last_write = last_write_at()
+    return [
+        alias for alias in replica_aliases()
+        if (synced_at(alias) or -1) >= last_write
+    ]
+
+
+def note_write():
+    """
+    Запрос что-то записал: дальше он читает основную базу, а клиент
+    получает cookie REPLICA_PIN_COOKIE. Вызывается и для записей,
+    которые выполняет поток-писатель (core.writer.run_write).
+    """
+    _state.wrote = True
+
+
+@contextmanager
+def replica_reads(allowed):
+    """
+    Маршрутизация чтений на время запроса: при allowed — на свежие
+    реплики, пока запрос ничего не записал. Вне запросов (команды,
+    shell) всё читается из основной базы.
+    """
+    _state.replicas = fresh_replicas() if allowed else []
+    _state.wrote = False
+    try:
+        yield _state
+    finally:
+        _state.replicas = []
+
+
+class ReplicaRouter:
+    """ Пишем в основную базу, читаем из реплик, если это безопасно """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(_state, 'replicas', None)
+        if replicas and not _state.wrote:
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        note_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с копией базы
+        return db not in replica_aliases()
@@ -0,0 +1,57 @@
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from .compression import brotli, brotli_bytes, gzip_bytes
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.json', '.txt', '.xml')
+# Меньше не сжимаем: выигрыш съедят заголовки
+MIN_SIZE = 512
+
+
+def _gzip(data):
+    return gzip_bytes(data, level=9)
+
+
+def _brotli(data):
+    return brotli_bytes(data, quality=11)
+
+
+# Статика сжимается один раз при сборке — на максимальном уровне
+ENCODINGS = {'.gz': _gzip}
+if brotli is not None:
+    ENCODINGS['.br'] = _brotli
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Имена с хэшем содержимого из манифеста и рядом со сжимаемыми
+    файлами — готовые .gz и .br (если установлен brotli): сервер
+    отдаёт их без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files.values()) | set(paths)
+        for name in sorted(names):
+            for compressed in self.compress(name):
+                yield name, compressed, True
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+            return
+        with self.open(name) as stream:
+            data = stream.read()
+        if len(data) < MIN_SIZE:
+            return
+        for suffix, compress in ENCODINGS.items():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            path = self.path(name + suffix)
+            with open(path, 'wb') as stream:
+                stream.write(compressed)
+            os.utime(path, (os.path.getmtime(self.path(name)),) * 2)
+            yield name + suffix
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..auth import user_cache_key
+from ..filecache import SharedFileCache
+
+User = get_user_model()
+
+
+class CachedAuthTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author', password='old-password-1')
+        self.client.force_login(self.user)
+        self.key = user_cache_key(self.user.pk)
+
+    def test_user_served_from_cache(self):
+        """Второй запрос не читает ни сессию, ни пользователя из базы."""
+        url = reverse('about:author')
+        self.client.get(url)
+        self.assertIsNotNone(cache.get(self.key))
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля сбрасывает кэш: старые сессии недействительны."""
+        other = Client()
+        other.force_login(self.user)
+        create = reverse('posts:post_create')
+        self.assertEqual(other.get(create).status_code, 200)
+        response = self.client.post(reverse('users:password_change_form'), {
+            'old_password': 'old-password-1',
+            'new_password1': 'new-password-2',
+            'new_password2': 'new-password-2',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(create).status_code, 200)
+        self.assertRedirects(
+            other.get(create), f'{reverse("users:login")}?next={create}')
+
+    def test_user_edit_and_logout_invalidate(self):
+        """Правка пользователя и выход сбрасывают запись в кэше."""
+        self.client.get(reverse('about:author'))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertIsNone(cache.get(self.key))
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(self.key))
+
+    def test_invalidation_reaches_other_processes(self):
+        """Сброс виден кэшу другого процесса: кэш общий, а не в памяти."""
+        other_process = SharedFileCache(
+            settings.CACHES['default']['LOCATION'], {})
+        self.client.get(reverse('about:author'))
+        session_key = KEY_PREFIX + self.client.session.session_key
+        self.assertIsNotNone(other_process.get(self.key))
+        self.assertIsNotNone(other_process.get(session_key))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(other_process.get(self.key))
+        self.assertIsNone(other_process.get(session_key))
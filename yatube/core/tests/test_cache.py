@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from posts.caching import POSTS_SCOPE, bump_feed_versions, feed_versions
+
+from ..cache import get_or_compute
+from ..filecache import SharedFileCache
+
+THREADS = 32
+PROCESSES = 8
+
+
+class CoalescedCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def slow_compute(self, value):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.2)
+            return value
+        return compute
+
+    def run_threads(self, version, compute):
+        barrier = threading.Barrier(THREADS)
+        results = [None] * THREADS
+
+        def worker(number):
+            barrier.wait()
+            results[number] = get_or_compute(
+                'hot-key', version, compute, timeout=60)
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_single_flight_on_empty_cache(self):
+        """Пустой кэш: пересчитывает один поток, остальные ждут его."""
+        results = self.run_threads(1, self.slow_compute('fresh'))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['fresh'] * THREADS)
+
+    def test_stale_while_revalidate(self):
+        """Устаревшее значение отдаётся, пока один поток пересчитывает."""
+        get_or_compute('hot-key', 1, lambda: 'old', timeout=60)
+        results = self.run_threads(2, self.slow_compute('new'))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results.count('new'), 1)
+        self.assertEqual(results.count('old'), THREADS - 1)
+        self.assertEqual(get_or_compute(
+            'hot-key', 2, self.slow_compute('other'), timeout=60), 'new')
+
+    def test_expired_value_is_stale(self):
+        """После timeout значение считается устаревшим."""
+        get_or_compute('hot-key', 1, lambda: 'old', timeout=0)
+        self.assertEqual(
+            get_or_compute('hot-key', 1, lambda: 'new', timeout=60), 'new')
+
+    def test_none_is_not_cached(self):
+        """None не кэшируется: ожидающие считают сами после блокировки."""
+        results = self.run_threads(1, self.slow_compute(None))
+        self.assertEqual(results, [None] * THREADS)
+        self.assertIsNone(cache.get('hot-key'))
+
+
+def _compute_in_process(location, calls_path, barrier, results):
+    """ Рабочий процесс со своим клиентом кэша """
+    process_cache = SharedFileCache(location, {})
+
+    def compute():
+        with open(calls_path, 'a') as stream:
+            stream.write('x')
+        time.sleep(0.3)
+        return 'fresh'
+
+    barrier.wait()
+    results.put(get_or_compute(
+        'hot-key', 1, compute, timeout=60, cache=process_cache))
+
+
+class SharedCacheTest(SimpleTestCase):
+    """Кэш общий для процессов: блокировки и версии видны всем."""
+
+    def setUp(self):
+        cache.clear()
+        self.context = multiprocessing.get_context('fork')
+
+    def test_single_flight_across_processes(self):
+        """Из нескольких процессов значение пересчитывает один."""
+        with tempfile.TemporaryDirectory() as directory:
+            calls_path = os.path.join(directory, 'calls')
+            location = os.path.join(directory, 'cache')
+            barrier = self.context.Barrier(PROCESSES)
+            results = self.context.Queue()
+            processes = [
+                self.context.Process(
+                    target=_compute_in_process,
+                    args=(location, calls_path, barrier, results))
+                for _ in range(PROCESSES)
+            ]
+            for process in processes:
+                process.start()
+            values = [results.get(timeout=30) for _ in processes]
+            for process in processes:
+                process.join()
+            with open(calls_path) as stream:
+                self.assertEqual(stream.read(), 'x')
+        self.assertEqual(values, ['fresh'] * PROCESSES)
+
+    def test_version_bump_seen_by_other_process(self):
+        """Запись в другом процессе (например, импорт) меняет версию."""
+        version = feed_versions([POSTS_SCOPE])[0]
+        process = self.context.Process(
+            target=bump_feed_versions, args=([POSTS_SCOPE],))
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertGreater(feed_versions([POSTS_SCOPE])[0], version)
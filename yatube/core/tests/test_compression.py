@@ -0,0 +1,85 @@
+import gzip
+from hashlib import md5
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils.text import compress_sequence
+
+from posts.models import Post
+
+from .. import compression
+from ..compression import compress_response
+
+User = get_user_model()
+
+
+class CompressionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Повторяющийся текст поста {number}')
+            for number in range(10)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.compressed = 0
+
+    def counting_gzip(self, data):
+        self.compressed += 1
+        return compression.gzip_bytes(data)
+
+    def test_page_compressed_once(self):
+        """Страница сжимается один раз, дальше тело берётся из кэша."""
+        codecs = {'gzip': (self.counting_gzip, compress_sequence)}
+        with mock.patch.dict(compression.CODECS, codecs, clear=True):
+            for _ in range(3):
+                response = self.client.get(
+                    reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(self.compressed, 1)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        html = gzip.decompress(response.content).decode()
+        self.assertIn('Повторяющийся текст поста 9', html)
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+
+    def test_stale_body_not_cached_as_new(self):
+        """Сжатое тело устаревшей страницы не подменяет новую."""
+        url = reverse('posts:index')
+        self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        Post.objects.create(
+            author=User.objects.get(), text='Новый пост ' * 100)
+        # Страницу пересчитывает другой процесс: отдаётся прежняя
+        lock = f'feed_page:{md5(url.encode()).hexdigest()}:lock'
+        cache.add(lock, 'other', 60)
+        self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        cache.delete(lock)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn('Новый пост', gzip.decompress(response.content).decode())
+
+    def test_not_accepted(self):
+        """Без Accept-Encoding ответ уходит как есть."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertContains(response, 'Повторяющийся текст поста 9')
+
+    def test_small_and_streaming(self):
+        """Короткий ответ не сжимается, потоковый сжимается по частям."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        small = compress_response(request, HttpResponse('коротко'))
+        self.assertNotIn('Content-Encoding', small)
+        with mock.patch.dict(compression.CODECS, clear=True, gzip=(
+                compression.gzip_bytes, compress_sequence)):
+            stream = compress_response(request, StreamingHttpResponse(
+                iter([b'a,b\n'] * 1000), content_type='text/csv'))
+        self.assertEqual(stream['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(stream.streaming_content)),
+            b'a,b\n' * 1000)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+PRODUCTION = settings.DATABASE_PROFILES['production']
+
+
+class DatabaseProfileTest(SimpleTestCase):
+    def connect(self, name):
+        settings_dict = dict(connection.settings_dict, NAME=name)
+        wrapper = DatabaseWrapper(settings_dict)
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=PRODUCTION['PRAGMAS'])
+    def test_production_pragmas(self):
+        """Новое соединение получает PRAGMA профиля production."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+            # NORMAL
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -65536)
+            wrapper.close()
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_development_keeps_defaults(self):
+        """Без профиля журнал остаётся обычным."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+            wrapper.close()
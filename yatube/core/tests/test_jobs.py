@@ -0,0 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..jobs import claim, run_jobs, task
+from ..models import Job
+
+User = get_user_model()
+
+
+@task(queue='test')
+def failing_task(message):
+    raise RuntimeError(message)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    JOBS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class JobQueueTest(TestCase):
+    def test_password_reset_mail_is_queued(self):
+        """Сброс пароля не шлёт письмо сам: его отправляет исполнитель."""
+        for number in range(2):
+            User.objects.create_user(
+                username=f'user{number}', email=f'user{number}@example.com',
+                password='password')
+            response = self.client.post(
+                reverse('users:password_reset_form'),
+                {'email': f'user{number}@example.com'})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.filter(queue='email').count(), 2)
+        out = StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['user0@example.com', 'user1@example.com'])
+        self.assertFalse(Job.objects.exists())
+        self.assertIn('email: выполнено 2', out.getvalue())
+
+    def test_retry_with_backoff_then_fail(self):
+        """Упавшая задача повторяется с паузой, потом помечается failed."""
+        job = failing_task.enqueue(message='сбой')
+        run_jobs(claim('test'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('сбой', job.last_error)
+        self.assertGreater(
+            job.run_at,
+            timezone.now() + timedelta(seconds=settings.JOBS_RETRY_DELAY - 1))
+        self.assertEqual(claim('test'), [])
+
+        Job.objects.filter(pk=job.pk).update(
+            attempts=settings.JOBS_MAX_ATTEMPTS - 1, run_at=timezone.now())
+        run_jobs(claim('test'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
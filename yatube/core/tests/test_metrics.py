@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import (
+    COUNT, QUERIES, Registry, read_snapshots, registry, write_snapshot
+)
+
+User = get_user_model()
+TOKEN = 'secret'
+
+
+class RegistryTest(TestCase):
+    def test_threads_aggregate_without_locks(self):
+        """Потоки пишут каждый в свою копию, снимок их складывает."""
+        metrics = Registry((0.1, 1))
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            for _ in range(1000):
+                metrics.record('view', 0.05, 2, 0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = metrics.snapshot()['view']
+        self.assertEqual(stats[0], 8000)
+        self.assertEqual(stats[metrics.offset + COUNT], 8000)
+        self.assertEqual(stats[metrics.offset + QUERIES], 16000)
+
+    def test_finished_threads_are_folded(self):
+        """Копии завершившихся потоков не копятся, их данные остаются."""
+        metrics = Registry((0.1, 1))
+        for _ in range(20):
+            thread = threading.Thread(
+                target=metrics.record, args=('view', 0.05, 1, 0.01))
+            thread.start()
+            thread.join()
+        self.assertEqual(metrics.snapshot()['view'][0], 20)
+        self.assertEqual(len(metrics._shards), 0)
+
+    def test_slow_requests_fall_into_overflow_bucket(self):
+        """Запрос дольше всех границ учитывается только в +Inf."""
+        metrics = Registry((0.1, 1))
+        metrics.record('view', 5, 0, 0)
+        self.assertEqual(metrics.snapshot()['view'][:3], [0, 0, 1])
+
+
+class MetricsViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_views_are_measured(self):
+        """Запрос к ленте попадает в гистограмму и счётчик SQL."""
+        self.client.get(reverse('posts:index'))
+        text = self.staff_client.get(
+            reverse('core:metrics')).content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            text)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 1', text)
+        self.assertRegex(
+            text, r'yatube_db_queries_total\{view="posts:index"\} [1-9]')
+
+    def test_access(self):
+        """Метрики видят сотрудник и сборщик с токеном, но не адрес."""
+        url = reverse('core:metrics')
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        response = self.staff_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        with override_settings(METRICS_TOKEN=TOKEN):
+            self.assertEqual(self.client.get(
+                url, HTTP_AUTHORIZATION=f'Bearer {TOKEN}').status_code, 200)
+            self.assertEqual(self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer other').status_code, 403)
+
+    def test_snapshots_are_aggregated(self):
+        """Снимки процессов складываются при выдаче."""
+        with tempfile.TemporaryDirectory() as directory:
+            registry.record('posts:index', 0.01, 3, 0.001)
+            write_snapshot(directory)
+            # Снимок «другого» процесса
+            os.rename(
+                os.path.join(directory, f'{os.getpid()}.json'),
+                os.path.join(directory, '1.json'),
+            )
+            registry.reset()
+            with override_settings(METRICS_SNAPSHOT_DIR=directory):
+                self.client.get(reverse('posts:index'))
+                views = read_snapshots(directory)
+                response = self.staff_client.get(reverse('core:metrics'))
+        self.assertEqual(views['posts:index'][registry.offset + COUNT], 2)
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            response.content.decode())
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..replication import last_write_at, sync_replica, synced_at
+from ..writer import stop_write_queue
+
+User = get_user_model()
+
+
+class ReplicaTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.add_database('replica_test', self.path('replica.db'))
+        written = self.settings(
+            REPLICA_LAST_WRITE_FILE=self.path('primary.written'))
+        written.enable()
+        self.addCleanup(written.disable)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def add_database(self, alias, name):
+        connections.databases[alias] = dict(
+            connections.databases['default'], NAME=name)
+
+        def remove():
+            connections[alias].close()
+            del connections.databases[alias]
+            delattr(connections._connections, alias)
+        self.addCleanup(remove)
+
+    def test_sync_between_files(self):
+        """Копия из одного файла SQLite в другой и метка времени."""
+        self.add_database('primary', self.path('primary.db'))
+        with connections['primary'].cursor() as cursor:
+            cursor.execute('CREATE TABLE note (text TEXT)')
+            cursor.execute("INSERT INTO note VALUES ('первая')")
+        started = sync_replica('replica_test', source='primary')
+        with connections['replica_test'].cursor() as cursor:
+            cursor.execute('SELECT text FROM note')
+            self.assertEqual(cursor.fetchall(), [('первая',)])
+        self.assertEqual(synced_at('replica_test'), started)
+
+    def test_reads_from_replica_until_write(self):
+        """Гости читают реплику; автор после поста — основную базу."""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='Скопированный пост')
+        sync_replica('replica_test')
+        # Пост есть только в реплике: по нему видно, откуда чтение
+        with connections['replica_test'].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Post._meta.db_table} '
+                f"SET text = 'Пост из реплики'")
+        index = reverse('posts:index')
+        self.assertContains(self.client.get(index), 'Пост из реплики')
+
+        member = Client()
+        member.force_login(author)
+        response = member.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'},
+            follow=True)
+        self.assertIn(settings.REPLICA_PIN_COOKIE, member.cookies)
+        self.assertContains(response, 'Новый пост')
+        # Реплика старше записи — гости тоже читают основную
+        self.assertContains(self.client.get(index), 'Новый пост')
+
+    def test_write_outside_site_makes_replica_stale(self):
+        """Запись не через сайт тоже отмечается, после COMMIT."""
+        author = User.objects.create_user(username='author')
+        sync_replica('replica_test')
+        synced = synced_at('replica_test')
+        self.assertLessEqual(last_write_at(), synced)
+        with transaction.atomic():
+            Post.objects.create(author=author, text='Из команды')
+            self.assertLessEqual(last_write_at(), synced)
+        self.assertGreater(last_write_at(), synced)
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Из команды')
+
+    def test_queued_write_pins_client(self):
+        """Запись через поток-писатель тоже ставит cookie запросу."""
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        sync_replica('replica_test')
+        member = Client()
+        member.force_login(reader)
+        with self.settings(WRITE_QUEUE=True):
+            self.addCleanup(stop_write_queue)
+            member.post(reverse('posts:profile_follow', args=('author',)))
+        self.assertIn(settings.REPLICA_PIN_COOKIE, member.cookies)
+        self.assertTrue(
+            author.following.filter(user=reader).exists())
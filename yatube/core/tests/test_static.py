@@ -0,0 +1,69 @@
+import gzip
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, override_settings
+
+from ..middleware import IMMUTABLE
+
+CSS = 'css/bootstrap.min.css'
+
+
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(
+            STATIC_PIPELINE=True,
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings.disable()
+        shutil.rmtree(cls.root)
+
+    def test_collectstatic_writes_hashed_and_gzip(self):
+        """collectstatic пишет имена с хэшем и их .gz."""
+        url = staticfiles_storage.url(CSS)
+        self.assertRegex(url, r'^/static/css/bootstrap\.min\.\w{12}\.css$')
+        path = staticfiles_storage.path(staticfiles_storage.stored_name(CSS))
+        with open(path, 'rb') as original, gzip.open(path + '.gz') as packed:
+            self.assertEqual(packed.read(), original.read())
+
+    def test_serves_precompressed_immutable(self):
+        """Файл с хэшем отдаётся сжатым и кэшируется навсегда."""
+        url = staticfiles_storage.url(CSS)
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        with staticfiles_storage.open(CSS) as original:
+            self.assertEqual(body, original.read())
+
+    def test_unhashed_name_revalidates(self):
+        """Имя без хэша отдаётся как есть и проверяется по дате."""
+        client = Client()
+        response = client.get(f'/static/{CSS}')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response = client.get(
+            f'/static/{CSS}',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_file_falls_through(self):
+        """Чего нет в STATIC_ROOT, того не отдаём."""
+        response = Client().get('/static/../manage.py')
+        self.assertEqual(response.status_code, 404)
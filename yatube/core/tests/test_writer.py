@@ -0,0 +1,53 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from .. import writer
+from ..writer import run_write, stop_write_queue
+
+User = get_user_model()
+THREADS = 8
+
+
+@override_settings(WRITE_QUEUE=True)
+class WriteQueueTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(stop_write_queue)
+
+    def test_concurrent_writes(self):
+        """Записи из многих потоков выполняет один писатель."""
+        results = [None] * THREADS
+        barrier = threading.Barrier(THREADS)
+
+        def worker(number):
+            barrier.wait()
+            user = User(username=f'writer{number}')
+            run_write(user.save)
+            results[number] = user.pk
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(results)), THREADS)
+        self.assertEqual(User.objects.filter(pk__in=results).count(), THREADS)
+        self.assertEqual(writer.write_queue().writes, THREADS)
+
+    def test_error_is_isolated(self):
+        """Ошибка достаётся вызвавшему, его изменения откатываются."""
+        def failing():
+            User.objects.create(username='rolled-back')
+            raise ValueError('ошибка')
+
+        with self.assertRaises(ValueError):
+            run_write(failing)
+        run_write(lambda: User.objects.create(username='kept'))
+        self.assertFalse(User.objects.filter(username='rolled-back').exists())
+        self.assertTrue(User.objects.filter(username='kept').exists())
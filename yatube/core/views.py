@@ -1,5 +1,12 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from .metrics import CONTENT_TYPE, collect, render_prometheus
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +18,23 @@ def csrf_failure(request, reason=''):
 
 def internal_server_error(request, reason=''):
     return render(request, 'core/500.html', {'path': request.path}, status=500)
+
+
+def _has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    # compare_digest принимает строки только из ASCII
+    return bool(token) and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', '').encode(),
+        f'Bearer {token}'.encode())
+
+
+def metrics(request):
+    """
+    Метрики в формате Prometheus для сотрудников и сборщика с токеном
+    METRICS_TOKEN. Адрес клиента не проверяется: за обратным прокси
+    REMOTE_ADDR у всех запросов локальный.
+    """
+    if not (request.user.is_staff or _has_metrics_token(request)):
+        raise PermissionDenied
+    return HttpResponse(
+        render_prometheus(collect()), content_type=CONTENT_TYPE)
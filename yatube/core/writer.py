@@ -0,0 +1,123 @@
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .routers import note_write
+
+_STOP = object()
+
+
+class WriteRequest:
+    """ Запись, ждущая своей очереди; done — когда транзакция завершена """
+
+    def __init__(self, func):
+        self.func = func
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class WriteQueue:
+    """
+    Единственный поток-писатель. Запросы передают ему функции записи
+    и ждут результата; всё, что накопилось в очереди, выполняется
+    одной транзакцией (group commit), каждая запись — в своей точке
+    сохранения: ошибка одной не откатывает остальные.
+    """
+
+    def __init__(self, max_batch):
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.writes = 0
+        self.thread = threading.Thread(
+            target=self.run, name='write-queue', daemon=True)
+        self.thread.start()
+
+    def submit(self, func):
+        request = WriteRequest(func)
+        self.requests.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stop(self):
+        """ Дописывает очередь и останавливает поток """
+        self.requests.put(_STOP)
+        self.thread.join()
+
+    def run(self):
+        try:
+            while True:
+                batch = [self.requests.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self.requests.get_nowait())
+                    except queue.Empty:
+                        break
+                requests = [item for item in batch if item is not _STOP]
+                if requests:
+                    self.commit(requests)
+                if len(requests) < len(batch):
+                    return
+        finally:
+            connection.close()
+
+    def commit(self, requests):
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for request in requests:
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((request, request.func(), None))
+                    except Exception as error:
+                        outcomes.append((request, None, error))
+        except Exception as error:
+            # Не удался COMMIT: не записалось ничего
+            outcomes = [(request, None, error) for request in requests]
+            connection.close_if_unusable_or_obsolete()
+        self.batches += 1
+        self.writes += len(requests)
+        for request, result, error in outcomes:
+            request.result = result
+            request.error = error
+            request.done.set()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def write_queue():
+    """ Очередь процесса; поток-писатель запускается при первой записи """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteQueue(settings.WRITE_QUEUE_MAX_BATCH)
+        return _queue
+
+
+def stop_write_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.stop()
+            _queue = None
+
+
+def run_write(func):
+    """
+    Выполняет запись func() и возвращает её результат. При WRITE_QUEUE
+    запись уходит потоку-писателю, иначе выполняется сразу в своей
+    транзакции. Внутри открытой транзакции очередь не используется:
+    писатель не увидел бы её изменений.
+    """
+    note_write()
+    if not settings.WRITE_QUEUE or connection.in_atomic_block:
+        with transaction.atomic():
+            return func()
+    return write_queue().submit(func)
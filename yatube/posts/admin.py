@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Group, Post
+from .models import Follow, Group, Post
+from .search import filter_matching
 
 
 @admin.register(Post)
@@ -11,8 +12,21 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """ Поиск по тексту через FTS5-индекс вместо LIKE '%...%' """
+        if not search_term:
+            return queryset, False
+        return filter_matching(queryset, search_term), False
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'slug', 'description')
+    list_display = ('pk', 'title', 'slug', 'description', 'posts_count')
     empty_value_display = '-пусто-'
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    search_fields = ('user__username', 'author__username')
+    raw_id_fields = ('user', 'author')
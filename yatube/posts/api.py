@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .caching import (
+    AUTHOR_SCOPE, GROUP_SCOPE, POSTS_SCOPE, cache_page_for_guests,
+    conditional_feed, conditional_post
+)
+from .models import Group, User
+from .queries import feed_posts
+from .utils import CURSOR_PARAM, CursorPaginator
+
+FIELDS_PARAM = 'fields'
+# Поле ответа → значение из поста feed_posts(); шаблоны не рендерятся
+API_FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'author_name': lambda post: post.author.get_full_name(),
+    'group': lambda post: post.group.slug if post.group else None,
+    'group_title': lambda post: post.group.title if post.group else None,
+}
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def _fields(request):
+    """ Запрошенные поля ?fields=id,text; неизвестные — ошибка 400 """
+    value = request.GET.get(FIELDS_PARAM)
+    if not value:
+        return tuple(API_FIELDS)
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown or not fields:
+        return None
+    return fields
+
+
+def _fields_error():
+    return JsonResponse(
+        {'error': 'Неизвестные поля', 'fields': list(API_FIELDS)},
+        status=400, json_dumps_params=JSON_PARAMS,
+    )
+
+
+def serialize(post, fields):
+    return {name: API_FIELDS[name](post) for name in fields}
+
+
+def _feed(request, posts):
+    """ Страница ленты в JSON: keyset-пагинация по ?cursor= """
+    fields = _fields(request)
+    if fields is None:
+        return _fields_error()
+    paginator = CursorPaginator(posts, settings.POSTS_PER_PAGE)
+    page = paginator.get_page(request.GET.get(CURSOR_PARAM))
+    return JsonResponse(
+        {
+            'results': [serialize(post, fields) for post in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        },
+        json_dumps_params=JSON_PARAMS,
+    )
+
+
+@conditional_feed(POSTS_SCOPE)
+@cache_page_for_guests(POSTS_SCOPE)
+def api_index(request):
+    return _feed(request, feed_posts())
+
+
+@conditional_feed(GROUP_SCOPE)
+@cache_page_for_guests(GROUP_SCOPE)
+def api_group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return _feed(request, feed_posts(group=group))
+
+
+@conditional_feed(AUTHOR_SCOPE)
+@cache_page_for_guests(AUTHOR_SCOPE)
+def api_profile(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return _feed(request, feed_posts(author=author))
+
+
+@conditional_post
+def api_post_detail(request, post_id):
+    fields = _fields(request)
+    if fields is None:
+        return _fields_error()
+    post = get_object_or_404(feed_posts(), pk=post_id)
+    return JsonResponse(serialize(post, fields), json_dumps_params=JSON_PARAMS)
@@ -0,0 +1,262 @@
+from datetime import datetime, timezone
+from functools import wraps
+from hashlib import md5
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+from django.template.loader import render_to_string
+from django.utils.http import http_date, quote_etag
+from django.utils.safestring import mark_safe
+
+from core.cache import get_many_or_compute, get_or_compute
+
+from .models import Post
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_VARIANTS = (
+    (False, False),
+    (False, True),
+    (True, False),
+    (True, True),
+)
+CARD_HITS_KEY = 'post_card:hits'
+CARD_MISSES_KEY = 'post_card:misses'
+# Области версий лент: все посты, группа, автор
+POSTS_SCOPE = 'posts'
+GROUP_SCOPE = 'group:{slug}'
+AUTHOR_SCOPE = 'author:{username}'
+
+
+def card_key(post_id, show_link, author_link):
+    """ Ключ карточки: пост и вариант шаблона """
+    return f'post_card:{post_id}:{int(show_link)}{int(author_link)}'
+
+
+def card_version(post):
+    """ Версия карточки — время последнего изменения поста """
+    return int(post.mod_date.timestamp() * 1_000_000)
+
+
+def render_cards(posts, show_link=False, author_link=False):
+    """
+    HTML карточек постов: готовые берутся из кэша одним get_many,
+    недостающие и устаревшие рендерятся с защитой от набега
+    и сохраняются одним set_many.
+    """
+    rendered = []
+
+    def render(post):
+        def compute():
+            rendered.append(post.pk)
+            return render_to_string(CARD_TEMPLATE, {
+                'post': post,
+                'show_link': show_link,
+                'author_link': author_link,
+            })
+        return compute
+
+    posts = list(posts)
+    keys = [card_key(post.pk, show_link, author_link) for post in posts]
+    cards = get_many_or_compute(
+        {
+            key: (card_version(post), render(post))
+            for key, post in zip(keys, posts)
+        },
+        settings.POST_CARD_CACHE_TIMEOUT,
+    )
+    _count(CARD_HITS_KEY, len(keys) - len(rendered))
+    _count(CARD_MISSES_KEY, len(rendered))
+    return [mark_safe(cards[key]) for key in keys]
+
+
+def invalidate_cards(post_ids):
+    """ Удаляет все варианты карточек постов """
+    cache.delete_many([
+        card_key(post_id, *variant)
+        for post_id in post_ids
+        for variant in CARD_VARIANTS
+    ])
+
+
+def card_cache_stats():
+    """ Попадания и промахи кэша карточек """
+    stats = cache.get_many((CARD_HITS_KEY, CARD_MISSES_KEY))
+    return {
+        'hits': stats.get(CARD_HITS_KEY, 0),
+        'misses': stats.get(CARD_MISSES_KEY, 0),
+    }
+
+
+def _count(key, amount):
+    if not amount:
+        return
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, amount)
+
+
+def _version_key(scope):
+    return f'feed_version:{scope}'
+
+
+def _new_version():
+    return int(time.time() * 1_000_000)
+
+
+def feed_versions(scopes):
+    """
+    Текущие версии областей лент. Версия — время последнего изменения
+    в микросекундах; потерянная из кэша версия начинается заново.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_feed_versions(scopes):
+    """ Новые версии для областей: закэшированные страницы устаревают """
+    version = _new_version()
+    cache.set_many(
+        {_version_key(scope): version for scope in set(scopes)}, None)
+
+
+def cached_count(queryset, scope=None):
+    """
+    COUNT(*) из кэша. Пересчитывается с новой версией области scope
+    (записи через модели) и не реже POSTS_COUNT_TIMEOUT — это предел
+    устаревания при записи в обход сигналов (bulk_create, SQL).
+    """
+    key = md5(str(queryset.query).encode()).hexdigest()
+    version = feed_versions([scope])[0] if scope else None
+    return get_or_compute(
+        f'posts_count:{key}', version, queryset.count,
+        settings.POSTS_COUNT_TIMEOUT,
+    )
+
+
+def group_scope(slug):
+    return GROUP_SCOPE.format(slug=slug)
+
+
+def author_scope(username):
+    return AUTHOR_SCOPE.format(username=username)
+
+
+def cache_page_for_guests(*scopes):
+    """
+    Кэширует страницу ленты для анонимных GET-запросов. scopes —
+    шаблоны областей, от которых зависит страница, например
+    GROUP_SCOPE; подставляются аргументы представления. Версия
+    страницы — версии её областей. Пока страницу пересчитывает другой
+    процесс, отдаётся прежняя: её ETag и Last-Modified ставятся по
+    версиям, с которыми она сохранена, а не по текущим — иначе
+    conditional_feed выдал бы старую страницу за новую.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            path = md5(request.get_full_path().encode()).hexdigest()
+            versions = feed_versions(
+                [scope.format(**kwargs) for scope in scopes])
+            response = None
+
+            def compute():
+                nonlocal response
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return None
+                return response.content, response['Content-Type'], versions
+
+            cached = get_or_compute(
+                f'feed_page:{path}',
+                '.'.join(str(version) for version in versions),
+                compute,
+                settings.FEED_PAGE_CACHE_TIMEOUT,
+            )
+            if cached is None:
+                return response
+            content, content_type, served = cached
+            response = HttpResponse(content, content_type=content_type)
+            if served != versions:
+                response['ETag'] = quote_etag(_etag(request, *served))
+                response['Last-Modified'] = http_date(
+                    _version_datetime(max(served)).timestamp())
+            return response
+        return wrapper
+    return decorator
+
+
+def _version_datetime(version):
+    return datetime.fromtimestamp(version / 1_000_000, tz=timezone.utc)
+
+
+def _etag(request, *parts):
+    """ ETag страницы: адрес, версии данных и пользователь """
+    parts = (request.get_full_path(), request.user.pk, *parts)
+    raw = ':'.join(str(part) for part in parts)
+    return md5(raw.encode()).hexdigest()
+
+
+def conditional_feed(*scopes):
+    """
+    ETag и Last-Modified для ленты по версиям её областей — без
+    запросов к базе и рендеринга; совпавшим запросам отвечает 304.
+    """
+    def versions(request, **kwargs):
+        if not hasattr(request, '_feed_versions'):
+            request._feed_versions = feed_versions(
+                [scope.format(**kwargs) for scope in scopes])
+        return request._feed_versions
+
+    def etag(request, *args, **kwargs):
+        return _etag(request, *versions(request, **kwargs))
+
+    def last_modified(request, *args, **kwargs):
+        return _version_datetime(max(versions(request, **kwargs)))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def _post_version(request, post_id):
+    """ Версия страницы поста: сам пост, его автор и группа """
+    if not hasattr(request, '_post_version'):
+        row = Post.objects.filter(pk=post_id).values_list(
+            'mod_date', 'author__username', 'group__slug').first()
+        version = None
+        if row is not None:
+            mod_date, username, slug = row
+            scopes = [author_scope(username)]
+            if slug is not None:
+                scopes.append(group_scope(slug))
+            version = max(
+                int(mod_date.timestamp() * 1_000_000),
+                *feed_versions(scopes),
+            )
+        request._post_version = version
+    return request._post_version
+
+
+def _post_etag(request, post_id):
+    version = _post_version(request, post_id)
+    return None if version is None else _etag(request, version)
+
+
+def _post_last_modified(request, post_id):
+    version = _post_version(request, post_id)
+    return None if version is None else _version_datetime(version)
+
+
+conditional_post = condition(
+    etag_func=_post_etag, last_modified_func=_post_last_modified)
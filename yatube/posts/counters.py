@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import AuthorStats, Group, Post
+
+
+def _change(queryset, delta, field='posts_count'):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_author_count(author_id, delta):
+    """ Сдвигает счётчик постов автора на delta """
+    if delta > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+    _change(AuthorStats.objects.filter(author_id=author_id), delta)
+
+
+def change_followers_count(author_id, delta):
+    """ Сдвигает счётчик подписчиков автора на delta """
+    if delta > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+    _change(
+        AuthorStats.objects.filter(author_id=author_id), delta,
+        'followers_count')
+
+
+def change_group_count(group_id, delta):
+    """ Сдвигает счётчик постов группы на delta """
+    if group_id is not None:
+        _change(Group.objects.filter(pk=group_id), delta)
+
+
+def change_counts(author_deltas, group_deltas):
+    """
+    Сдвигает счётчики многих авторов и групп сразу: по одному UPDATE
+    на каждое различное значение сдвига. Для пакетного импорта.
+    """
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(author_id=author_id)
+            for author_id, delta in author_deltas.items() if delta > 0
+        ],
+        ignore_conflicts=True,
+    )
+    for queryset, deltas in (
+        (AuthorStats.objects.all(), author_deltas),
+        (Group.objects.all(), group_deltas),
+    ):
+        by_delta = defaultdict(list)
+        for pk, delta in deltas.items():
+            if pk is not None and delta:
+                by_delta[delta].append(pk)
+        for delta, pks in by_delta.items():
+            _change(queryset.filter(pk__in=pks), delta)
+
+
+def author_posts_count(author):
+    """ Число постов автора по счётчику, без COUNT(*) """
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+@transaction.atomic
+def recount_posts():
+    """
+    Сверяет счётчики с таблицей постов и исправляет расхождения.
+    Возвращает число исправленных авторов и групп.
+    """
+    actual = dict(
+        Post.objects.order_by().values_list('author').annotate(Count('id'))
+    )
+    stored = dict(AuthorStats.objects.values_list('author', 'posts_count'))
+    authors_fixed = 0
+    for author_id in actual.keys() | stored.keys():
+        posts_count = actual.get(author_id, 0)
+        if stored.get(author_id) == posts_count:
+            continue
+        AuthorStats.objects.update_or_create(
+            author_id=author_id, defaults={'posts_count': posts_count})
+        authors_fixed += 1
+    groups = Group.objects.annotate(actual=Count('posts')).filter(
+        ~Q(posts_count=F('actual')))
+    groups_fixed = 0
+    for group in groups:
+        Group.objects.filter(pk=group.pk).update(posts_count=group.actual)
+        groups_fixed += 1
+    return authors_fixed, groups_fixed
@@ -0,0 +1,87 @@
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+# Те же поля, что читает import_posts, плюс id
+COLUMNS = ('id', 'author', 'text', 'group', 'pub_date')
+FIELDS = ('id', 'author__username', 'text', 'group__slug', 'pub_date')
+CHUNK_SIZE = 2000
+
+
+def parse_bound(value):
+    """ Граница периода: дата (начало суток) или дата со временем """
+    date = parse_datetime(value) or parse_date(value)
+    if date is None:
+        raise ValueError(f'неверная дата {value}')
+    if not isinstance(date, datetime):
+        date = datetime.combine(date, time.min)
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def export_filters(group=None, author=None, since=None, until=None):
+    """ Фильтры выгрузки; since включительно, until — нет """
+    filters = {}
+    if group:
+        filters['group__slug'] = group
+    if author:
+        filters['author__username'] = author
+    if since:
+        filters['pub_date__gte'] = parse_bound(since)
+    if until:
+        filters['pub_date__lt'] = parse_bound(until)
+    return filters
+
+
+def export_rows(filters=None, chunk_size=CHUNK_SIZE):
+    """
+    Кортежи COLUMNS по возрастанию id. Таблица проходится пачками
+    по ключу (id > последнего), так что в памяти одна пачка, а каждый
+    запрос — поиск по первичному ключу без OFFSET.
+    """
+    queryset = Post.objects.filter(**(filters or {})).order_by('pk')
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last_id).values_list(*FIELDS)[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+class _Echo:
+    """ Псевдофайл для csv.writer: отдаёт записанную строку """
+
+    def write(self, value):
+        return value
+
+
+def render_rows(rows, fmt):
+    """ Строки выгрузки в формате fmt, по одной на пост """
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow(_csv_values(row))
+        return
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _csv_values(row):
+    *values, pub_date = row
+    return (*values, pub_date.isoformat())
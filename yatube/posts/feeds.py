@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .caching import (
+    AUTHOR_SCOPE, GROUP_SCOPE, POSTS_SCOPE, cache_page_for_guests,
+    conditional_feed
+)
+from .models import Group, User
+from .queries import feed_posts
+
+TITLE_WORDS = 8
+
+
+class PostsFeed(Feed):
+    """ RSS последних постов сайта """
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return feed_posts()
+
+    def items(self, obj):
+        return self.posts(obj)[:settings.FEED_ITEMS]
+
+    def item_title(self, post):
+        return Truncator(post.text).words(TITLE_WORDS)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=(post.pk,))
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.mod_date
+
+
+class GroupPostsFeed(PostsFeed):
+    """ RSS последних постов группы """
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def posts(self, group):
+        return feed_posts(group=group)
+
+
+class AuthorPostsFeed(PostsFeed):
+    """ RSS последних постов автора """
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи автора {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+    def posts(self, author):
+        return feed_posts(author=author)
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class AtomPostsFeed(AtomMixin, PostsFeed):
+    pass
+
+
+class AtomGroupPostsFeed(AtomMixin, GroupPostsFeed):
+    pass
+
+
+class AtomAuthorPostsFeed(AtomMixin, AuthorPostsFeed):
+    pass
+
+
+def cached_feed(feed, scope):
+    """
+    Ленту отдают те же версии, что и HTML: XML кэшируется до
+    изменения постов области, а ETag/Last-Modified проверяются
+    без обращения к базе.
+    """
+    return conditional_feed(scope)(cache_page_for_guests(scope)(feed))
+
+
+index_rss = cached_feed(PostsFeed(), POSTS_SCOPE)
+index_atom = cached_feed(AtomPostsFeed(), POSTS_SCOPE)
+group_rss = cached_feed(GroupPostsFeed(), GROUP_SCOPE)
+group_atom = cached_feed(AtomGroupPostsFeed(), GROUP_SCOPE)
+profile_rss = cached_feed(AuthorPostsFeed(), AUTHOR_SCOPE)
+profile_atom = cached_feed(AtomAuthorPostsFeed(), AUTHOR_SCOPE)
@@ -0,0 +1,60 @@
+FTS_TABLE = 'posts_post_fts'
+
+# Внешний контент: индекс хранит только токены, текст читается из
+# posts_post. Триггеры держат индекс в синхронизации при любой записи,
+# включая bulk_create и правки из админки.
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id', prefix='2 3')",
+)
+FTS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts_post "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF text "
+    f"ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+FTS_DROP = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+FTS_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_search_index(db_connection, rebuild=False):
+    """
+    Создаёт FTS5-индекс и триггеры, если их нет. SQLite при изменении
+    схемы posts_post пересоздаёт таблицу и теряет триггеры, поэтому
+    вызывается и после каждой миграции.
+    """
+    if db_connection.vendor != 'sqlite':
+        return
+    with db_connection.cursor() as cursor:
+        for statement in FTS_SCHEMA + FTS_TRIGGERS:
+            cursor.execute(statement)
+        if rebuild:
+            cursor.execute(FTS_REBUILD)
+
+
+def restore_search_triggers(db_connection):
+    """ Возвращает триггеры, если FTS5-индекс уже создан миграцией """
+    if db_connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE in db_connection.introspection.table_names():
+        install_search_index(db_connection)
+
+
+def drop_search_index(db_connection):
+    if db_connection.vendor != 'sqlite':
+        return
+    with db_connection.cursor() as cursor:
+        for statement in FTS_DROP:
+            cursor.execute(statement)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Follow
+from posts.timeline import backfill_timeline
+
+
+class Command(BaseCommand):
+    help = (
+        'Добавляет в ленты подписок последние посты авторов: после '
+        'импорта постов в обход сигналов или смены FANOUT_MAX_FOLLOWERS. '
+        'С --enqueue ставит задачи в очередь timeline для run_worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', nargs='+', help='Только ленты этих пользователей.')
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Не заполнять сразу, а поставить фоновые задачи.')
+
+    def handle(self, *args, **options):
+        follows = Follow.objects.order_by('pk')
+        if options['users']:
+            follows = follows.filter(user__username__in=options['users'])
+        total = 0
+        for user_id, author_id in follows.values_list(
+                'user_id', 'author_id').iterator():
+            if options['enqueue']:
+                backfill_timeline.enqueue(user_id=user_id, author_id=author_id)
+            else:
+                backfill_timeline(user_id=user_id, author_id=author_id)
+            total += 1
+        action = 'Поставлено задач' if options['enqueue'] else 'Заполнено'
+        self.stdout.write(f'{action} по подпискам: {total}')
@@ -0,0 +1,66 @@
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import benchmark_database, measure
+from posts.models import Group, Post, User
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число запросов в секунду для HTML-лент и JSON API '
+        'на временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=10000,
+            help='Сколько постов создать.')
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов отправить на каждый адрес.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            author, group, post = self.seed(options['posts'])
+            # Вход отключает кэш страниц для гостей: меряется рендеринг
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(author)
+            pairs = (
+                ('index', (), ()),
+                ('group_list', (group.slug,), (group.slug,)),
+                ('profile', (author.username,), (author.username,)),
+                ('post_detail', (post.pk,), (post.pk,)),
+            )
+            self.stdout.write(
+                f'{"view":>12} {"html, rps":>10} {"api, rps":>10}')
+            for name, html_args, api_args in pairs:
+                html = self.rps(
+                    client, reverse(f'posts:{name}', args=html_args),
+                    options['requests'])
+                api = self.rps(
+                    client, reverse(f'posts:api_{name}', args=api_args),
+                    options['requests'])
+                self.stdout.write(f'{name:>12} {html:>10.0f} {api:>10.0f}')
+
+    @staticmethod
+    def rps(client, url, requests):
+        timings = measure(lambda: client.get(url), requests)
+        return 1 / median(timings)
+
+    def seed(self, total):
+        author = User.objects.create_user(
+            username='bench', first_name='Бен', last_name='Чмарк')
+        group = Group.objects.create(
+            title='Бенчмарк', slug='bench', description='Бенчмарк')
+        for start in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(author=author, group=group, text=f'Пост {number}')
+                for number in range(start, min(total, start + BATCH_SIZE))
+            )
+        self.stdout.write(f'Создано постов: {total}')
+        return author, group, Post.objects.first()
@@ -0,0 +1,69 @@
+from statistics import median
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import benchmark_database, measure, ms
+from core.compression import brotli, brotli_bytes, gzip_bytes
+from posts.seeding import seed_dataset
+
+LEVELS = [
+    ('gzip', level, lambda data, level=level: gzip_bytes(data, level))
+    for level in (1, 6, 9)
+]
+if brotli is not None:
+    LEVELS += [
+        ('br', quality,
+         lambda data, quality=quality: brotli_bytes(data, quality))
+        for quality in (1, 5, 11)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Цена сжатия HTML лент index и group_list: время на страницу '
+        'и сэкономленные байты для gzip и brotli на разных уровнях, '
+        'а также время ответа со сжатым телом из кэша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз сжимать каждую страницу.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            users, groups = seed_dataset(
+                users=200, groups=10, posts=options['posts'])
+            pages = (
+                ('index', reverse('posts:index')),
+                ('group_list',
+                 reverse('posts:group_list', args=(groups[0].slug,))),
+            )
+            self.stdout.write(
+                f'{"page":>10} {"codec":>7} {"bytes":>7} {"out":>6} '
+                f'{"saved":>6} {"ms":>6} {"MB/s":>6}')
+            client = Client(HTTP_HOST='localhost')
+            for name, url in pages:
+                html = client.get(url).content
+                for codec, level, compress in LEVELS:
+                    size = len(compress(html))
+                    seconds = median(
+                        measure(lambda: compress(html), options['repeat']))
+                    self.stdout.write(
+                        f'{name:>10} {codec + str(level):>7} {len(html):>7} '
+                        f'{size:>6} {1 - size / len(html):>6.1%} '
+                        f'{ms(seconds):>6} '
+                        f'{len(html) / seconds / 1e6:>6.1f}')
+            self.stdout.write('Ответ гостю, медиана, мс:')
+            for name, url in pages:
+                plain = median(measure(
+                    lambda: client.get(url), options['repeat']))
+                packed = median(measure(
+                    lambda: client.get(url, HTTP_ACCEPT_ENCODING='gzip'),
+                    options['repeat']))
+                self.stdout.write(
+                    f'{name:>10} без сжатия {ms(plain)}, '
+                    f'gzip из кэша {ms(packed)}')
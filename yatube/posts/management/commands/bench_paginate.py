@@ -0,0 +1,74 @@
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from core.bench import benchmark_database, measure, ms
+from posts.models import Post, User
+from posts.utils import NEXT, CursorPaginator, encode_cursor
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время получения страницы ленты для OFFSET- и '
+        'keyset-пагинации на временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=100000,
+            help='Сколько страниц ленты создать.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз замерять каждую страницу.')
+
+    def handle(self, *args, **options):
+        per_page = settings.POSTS_PER_PAGE
+        pages = options['pages']
+        with benchmark_database():
+            self.seed(pages * per_page)
+            queryset = Post.objects.all()
+            self.stdout.write(
+                f'{"page":>8} {"offset, ms":>12} {"cursor, ms":>12}')
+            for number in self.checkpoints(pages):
+                offset = median(measure(
+                    lambda: list(
+                        Paginator(queryset, per_page).get_page(number)),
+                    options['repeat'],
+                ))
+                cursor = self.cursor_for(queryset, number, per_page)
+                keyset = median(measure(
+                    lambda: list(
+                        CursorPaginator(queryset, per_page).get_page(cursor)),
+                    options['repeat'],
+                ))
+                self.stdout.write(
+                    f'{number:>8} {ms(offset):>12} {ms(keyset):>12}')
+
+    def seed(self, total):
+        author = User.objects.create_user(username='bench')
+        for start in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(author=author, text=f'Пост {number}')
+                for number in range(start, min(total, start + BATCH_SIZE))
+            )
+        self.stdout.write(f'Создано постов: {total}')
+
+    @staticmethod
+    def checkpoints(pages):
+        number = 1
+        while number < pages:
+            yield number
+            number *= 10
+        yield pages
+
+    @staticmethod
+    def cursor_for(queryset, number, per_page):
+        """ Курсор, ведущий на страницу number (вне замера) """
+        if number == 1:
+            return None
+        last = queryset[(number - 1) * per_page - 1]
+        return encode_cursor(last, NEXT)
@@ -0,0 +1,71 @@
+import random
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.bench import benchmark_database, measure, ms
+from posts.models import Post, User
+from posts.search import SearchResults
+
+BATCH_SIZE = 10000
+SYLLABLES = (
+    'ка', 'то', 'ли', 'ра', 'но', 'ве', 'су', 'ми', 'до', 'пе',
+    'за', 'го', 'ны', 'ре', 'ша', 'бу',
+)
+WORDS_PER_POST = 12
+QUERIES = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по FTS5-индексу и text__icontains '
+        'на временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=200000,
+            help='Сколько постов создать.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз замерять каждый запрос.')
+
+    def handle(self, *args, **options):
+        per_page = settings.POSTS_PER_PAGE
+        with benchmark_database():
+            self.seed(options['posts'])
+            self.stdout.write(
+                f'{"query":>10} {"found":>8} {"fts, ms":>10} '
+                f'{"icontains, ms":>14}')
+            for word in self.vocabulary[:QUERIES]:
+                results = SearchResults(word)
+                fts = median(measure(
+                    lambda: (results.count(), results[:per_page]),
+                    options['repeat'],
+                ))
+                queryset = Post.objects.filter(text__icontains=word)
+                like = median(measure(
+                    lambda: (queryset.count(), list(queryset[:per_page])),
+                    options['repeat'],
+                ))
+                self.stdout.write(
+                    f'{word:>10} {results.count():>8} {ms(fts):>10} '
+                    f'{ms(like):>14}')
+
+    def seed(self, total):
+        author = User.objects.create_user(username='bench')
+        rng = random.Random(0)
+        # Трёхсложные слова: ~4000 вариантов, каждое встречается редко
+        self.vocabulary = [
+            ''.join(rng.choices(SYLLABLES, k=3)) for _ in range(4000)]
+        for start in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    author=author,
+                    text=' '.join(
+                        rng.choices(self.vocabulary, k=WORDS_PER_POST)),
+                )
+                for _ in range(start, min(total, start + BATCH_SIZE))
+            )
+        self.stdout.write(f'Создано постов: {total}')
@@ -0,0 +1,355 @@
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+from collections import defaultdict
+from statistics import mean
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import benchmark_database, ms, percentile
+from core.middleware import QueryTimer
+from posts.models import Post
+from posts.seeding import SEED_PASSWORD, seed_dataset
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'bench_baseline.json')
+# Доля запросов без входа среди тех, что не требуют авторизации
+GUEST_SHARE = 0.7
+# Номера страниц лент: чаще первая
+PAGES = (1, 1, 1, 2, 3, 10)
+
+
+# Имя: (вес, метод, нужен вход, адрес(ctx), данные(ctx))
+WORKLOAD = {
+    'posts:index': (
+        20, 'get', False, lambda ctx: reverse('posts:index'),
+        lambda ctx: ctx.page()),
+    'posts:group_list': (
+        12, 'get', False,
+        lambda ctx: reverse('posts:group_list', args=(ctx.group(),)),
+        lambda ctx: ctx.page()),
+    'posts:profile': (
+        12, 'get', False,
+        lambda ctx: reverse('posts:profile', args=(ctx.author(),)),
+        lambda ctx: ctx.page()),
+    'posts:post_detail': (
+        15, 'get', False,
+        lambda ctx: reverse('posts:post_detail', args=(ctx.post(),)),
+        None),
+    'posts:search': (
+        4, 'get', False, lambda ctx: reverse('posts:search'),
+        lambda ctx: {'q': ctx.word()}),
+    'posts:api_index': (
+        5, 'get', False, lambda ctx: reverse('posts:api_index'), None),
+    'posts:api_post_detail': (
+        3, 'get', False,
+        lambda ctx: reverse('posts:api_post_detail', args=(ctx.post(),)),
+        None),
+    'posts:index_rss': (
+        3, 'get', False, lambda ctx: reverse('posts:index_rss'), None),
+    'posts:group_list_atom': (
+        2, 'get', False,
+        lambda ctx: reverse('posts:group_list_atom', args=(ctx.group(),)),
+        None),
+    'posts:post_create': (
+        2, 'get', True, lambda ctx: reverse('posts:post_create'), None),
+    'posts:post_create [POST]': (
+        4, 'post', True, lambda ctx: reverse('posts:post_create'),
+        lambda ctx: {'text': ctx.text(), 'group': ctx.group_id()}),
+    'posts:post_edit': (
+        1, 'get', True,
+        lambda ctx: reverse('posts:post_edit', args=(ctx.own_post(),)),
+        None),
+    'posts:post_edit [POST]': (
+        2, 'post', True,
+        lambda ctx: reverse('posts:post_edit', args=(ctx.own_post(),)),
+        lambda ctx: {'text': ctx.text()}),
+    'about:author': (
+        2, 'get', False, lambda ctx: reverse('about:author'), None),
+    'about:tech': (2, 'get', False, lambda ctx: reverse('about:tech'), None),
+    'users:login': (2, 'get', False, lambda ctx: reverse('users:login'), None),
+    'users:signup': (
+        1, 'get', False, lambda ctx: reverse('users:signup'), None),
+    'users:signup [POST]': (
+        1, 'post', False, lambda ctx: reverse('users:signup'),
+        lambda ctx: ctx.signup()),
+    'users:password_change_form': (
+        1, 'get', True,
+        lambda ctx: reverse('users:password_change_form'), None),
+    'users:password_reset_form': (
+        1, 'get', False,
+        lambda ctx: reverse('users:password_reset_form'), None),
+}
+
+
+class Context:
+    """ Данные для адресов запросов одного клиента """
+
+    def __init__(self, dataset, user, own_posts, rng, number):
+        self.dataset = dataset
+        self.user = user
+        self.own_posts = own_posts
+        self.rng = rng
+        self.number = number
+        self.signups = 0
+
+    def group(self):
+        return self.rng.choice(self.dataset['groups'])
+
+    def group_id(self):
+        return self.rng.choice(self.dataset['group_ids'])
+
+    def author(self):
+        return self.rng.choice(self.dataset['authors'])
+
+    def post(self):
+        return self.rng.choice(self.dataset['posts'])
+
+    def own_post(self):
+        return self.rng.choice(self.own_posts)
+
+    def page(self):
+        return {'page': self.rng.choice(PAGES)}
+
+    def word(self):
+        return self.rng.choice(self.dataset['words'])
+
+    def text(self):
+        return ' '.join(self.rng.choices(self.dataset['words'], k=20))
+
+    def signup(self):
+        self.signups += 1
+        password = f'{SEED_PASSWORD}-{self.number}'
+        return {
+            'first_name': 'Нагрузка',
+            'last_name': 'Тест',
+            'username': f'bench{self.number}x{self.signups}',
+            'email': f'bench{self.number}x{self.signups}@example.com',
+            'password1': password,
+            'password2': password,
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест сайта: заполняет временную базу данными Faker '
+        'и гоняет смешанную нагрузку чтения и записи по адресам posts, '
+        'users и about из нескольких потоков. Печатает пропускную '
+        'способность, p50/p95/p99 и число запросов к базе и сравнивает '
+        'с сохранённым эталоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель Ципфа для авторов и групп.')
+        parser.add_argument(
+            '--clients', type=int, default=4,
+            help='Число одновременных клиентов (потоков).')
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Сколько запросов отправляет каждый клиент.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--baseline', default=DEFAULT_BASELINE,
+            help='Файл эталона для сравнения.')
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Сохранить результат как новый эталон.')
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='Ошибка, если p95 или пропускная способность хуже '
+                 'эталона больше чем на столько процентов.')
+
+    def handle(self, *args, **options):
+        # Потоки пишут в базу одновременно: нужна файловая база
+        with tempfile.TemporaryDirectory() as directory:
+            with benchmark_database(os.path.join(directory, 'bench.db')):
+                dataset = self.seed(options)
+                result = self.run(dataset, options)
+        self.report(result)
+        self.compare(result, options)
+
+    def seed(self, options):
+        start = perf_counter()
+        users, groups = seed_dataset(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            skew=options['skew'],
+            seed=options['seed'],
+        )
+        words = list({
+            word.strip('.,').lower()
+            for text in Post.objects.values_list('text', flat=True)[:200]
+            for word in text.split() if len(word) > 4
+        })
+        self.stdout.write(
+            f'Создано пользователей: {len(users)}, групп: {len(groups)}, '
+            f'постов: {options["posts"]} '
+            f'за {perf_counter() - start:.1f} с'
+        )
+        return {
+            'users': users,
+            'authors': [user.username for user in users],
+            'groups': [group.slug for group in groups],
+            'group_ids': [group.pk for group in groups],
+            'posts': list(Post.objects.values_list('pk', flat=True)[:2000]),
+            'words': sorted(words) or ['пост'],
+        }
+
+    def run(self, dataset, options):
+        samples = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['clients'] + 1)
+
+        def client_thread(number):
+            rng = random.Random(options['seed'] + number)
+            try:
+                clients = self.prepare_client(dataset, rng, number)
+            except Exception:
+                barrier.abort()
+                raise
+            barrier.wait()
+            local = []
+            try:
+                self.drive(*clients, rng, options['requests'], local)
+            finally:
+                connection.close()
+                with lock:
+                    for name, seconds, queries, failed in local:
+                        samples[name].append((seconds, queries))
+                        errors[name] += failed
+
+        threads = [
+            threading.Thread(target=client_thread, args=(number,))
+            for number in range(options['clients'])
+        ]
+        # Ошибки «database is locked» считаются, а не печатаются
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start = perf_counter()
+            for thread in threads:
+                thread.join()
+            elapsed = perf_counter() - start
+        finally:
+            request_logger.setLevel(level)
+        total = sum(len(values) for values in samples.values())
+        return {
+            'throughput': total / elapsed,
+            'requests': total,
+            'views': {
+                name: {
+                    'requests': len(values),
+                    'p50': percentile([s for s, _ in values], 50),
+                    'p95': percentile([s for s, _ in values], 95),
+                    'p99': percentile([s for s, _ in values], 99),
+                    'queries': mean(q for _, q in values),
+                    'errors': errors[name],
+                }
+                for name, values in sorted(samples.items())
+            },
+        }
+
+    @staticmethod
+    def prepare_client(dataset, rng, number):
+        """ Клиенты гостя и автора с его постами для правки """
+        user = rng.choice(dataset['users'][:50])
+        own_posts = list(Post.objects.filter(author=user).values_list(
+            'pk', flat=True)[:20])
+        if not own_posts:
+            own_posts = [
+                Post.objects.create(author=user, text='Пост для правки').pk]
+        guest = Client(HTTP_HOST='localhost')
+        member = Client(HTTP_HOST='localhost')
+        member.force_login(user)
+        return Context(dataset, user, own_posts, rng, number), guest, member
+
+    @staticmethod
+    def drive(ctx, guest, member, rng, requests, samples):
+        """ Отправляет requests запросов по весам WORKLOAD """
+        names = list(WORKLOAD)
+        weights = [WORKLOAD[name][0] for name in names]
+        for _ in range(requests):
+            name = rng.choices(names, weights)[0]
+            _, method, login, url, data = WORKLOAD[name]
+            client = member
+            if not login and rng.random() < GUEST_SHARE:
+                client = guest
+            timer = QueryTimer()
+            start = perf_counter()
+            try:
+                with connection.execute_wrapper(timer):
+                    response = getattr(client, method)(
+                        url(ctx), data(ctx) if data else None)
+                failed = response.status_code >= 400
+            except DatabaseError:
+                # Например, «database is locked» при записи
+                failed = True
+            samples.append(
+                (name, perf_counter() - start, timer.queries, failed))
+
+    def report(self, result):
+        self.stdout.write(
+            f'{"view":>30} {"n":>5} {"p50, ms":>9} {"p95, ms":>9} '
+            f'{"p99, ms":>9} {"queries":>8} {"errors":>6}')
+        for name, stats in result['views'].items():
+            self.stdout.write(
+                f'{name:>30} {stats["requests"]:>5} {ms(stats["p50"]):>9} '
+                f'{ms(stats["p95"]):>9} {ms(stats["p99"]):>9} '
+                f'{stats["queries"]:>8.1f} {stats["errors"]:>6}')
+        self.stdout.write(
+            f'Запросов: {result["requests"]}, '
+            f'пропускная способность: {result["throughput"]:.1f} запр/с')
+
+    def compare(self, result, options):
+        path = options['baseline']
+        if options['save_baseline']:
+            with open(path, 'w') as stream:
+                json.dump(result, stream, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Эталон сохранён: {path}')
+            return
+        if not os.path.exists(path):
+            self.stdout.write(
+                'Эталона нет; сохраните его с --save-baseline')
+            return
+        with open(path) as stream:
+            baseline = json.load(stream)
+        regressions = []
+
+        def change(new, old):
+            return (new - old) / old * 100 if old else 0.0
+
+        throughput = change(result['throughput'], baseline['throughput'])
+        self.stdout.write(f'Пропускная способность: {throughput:+.1f}%')
+        if -throughput > (options['max_regression'] or float('inf')):
+            regressions.append('пропускная способность')
+        for name, stats in result['views'].items():
+            old = baseline['views'].get(name)
+            if old is None:
+                continue
+            p95 = change(stats['p95'], old['p95'])
+            self.stdout.write(
+                f'{name:>30} p95 {p95:+.1f}%, запросов к базе '
+                f'{stats["queries"] - old["queries"]:+.1f}')
+            if p95 > (options['max_regression'] or float('inf')):
+                regressions.append(name)
+        if regressions:
+            raise CommandError(
+                'Хуже эталона: ' + ', '.join(regressions))
@@ -0,0 +1,129 @@
+import random
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from core.bench import benchmark_database, ms, percentile
+from core.middleware import QueryTimer
+from posts.counters import change_followers_count
+from posts.models import Follow, Post, TimelineEntry
+from posts.queries import feed_posts
+from posts.seeding import seed_dataset, skewed_weights
+from posts.timeline import TimelinePaginator, backfill_timeline
+from posts.utils import FEED_ORDERING, CursorPaginator
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время чтения ленты подписок из разложенных записей '
+        '(TimelinePaginator) и запросом IN (...) по постам авторов на '
+        'временной базе. Популярные авторы получают больше подписчиков; '
+        'те, у кого их больше --fanout-max-followers, подмешиваются при '
+        'чтении. Печатает p50/p95/p99 и число запросов на страницу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--follows', type=int, default=50,
+            help='На скольких авторов подписан каждый читатель.')
+        parser.add_argument(
+            '--readers', type=int, default=200,
+            help='Для скольких читателей замерять ленту.')
+        parser.add_argument(
+            '--pages', type=int, default=3,
+            help='Сколько страниц ленты читать подряд.')
+        parser.add_argument(
+            '--fanout-max-followers', type=int, default=100,
+            help='Порог FANOUT_MAX_FOLLOWERS на время замера.')
+        parser.add_argument('--skew', type=float, default=1.1)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with benchmark_database(), override_settings(
+                FANOUT_MAX_FOLLOWERS=options['fanout_max_followers']):
+            users = self.seed(options)
+            readers = users[:options['readers']]
+            self.stdout.write(
+                f'{"feed":>10} {"p50, ms":>9} {"p95, ms":>9} '
+                f'{"p99, ms":>9} {"queries":>8}')
+            for name, read in (
+                ('timeline', self.read_timeline),
+                ('in', self.read_in),
+            ):
+                self.report(name, self.measure(read, readers, options))
+
+    def seed(self, options):
+        start = perf_counter()
+        users, _ = seed_dataset(
+            users=options['users'], groups=10, posts=options['posts'],
+            skew=options['skew'], seed=options['seed'])
+        rng = random.Random(options['seed'])
+        weights = skewed_weights(len(users), options['skew'])
+        follows = set()
+        for user in users:
+            authors = rng.choices(
+                users, cum_weights=weights, k=options['follows'])
+            follows.update(
+                (user.pk, author.pk) for author in authors if author != user)
+        Follow.objects.bulk_create(
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in follows)
+        # bulk_create не вызывает сигналы: счётчики и ленты — здесь
+        followers = Counter(author_id for _, author_id in follows)
+        for author_id, count in followers.items():
+            change_followers_count(author_id, count)
+        for user_id, author_id in follows:
+            backfill_timeline(user_id=user_id, author_id=author_id)
+        merged = sum(
+            count > settings.FANOUT_MAX_FOLLOWERS
+            for count in followers.values())
+        self.stdout.write(
+            f'Постов: {Post.objects.count()}, подписок: {len(follows)}, '
+            f'записей лент: {TimelineEntry.objects.count()}, авторов '
+            f'с чтением без раскладки: {merged}, '
+            f'за {perf_counter() - start:.1f} с'
+        )
+        return users
+
+    @staticmethod
+    def read_timeline(user, cursor):
+        paginator = TimelinePaginator(user, settings.POSTS_PER_PAGE)
+        return paginator.get_page(cursor)
+
+    @staticmethod
+    def read_in(user, cursor):
+        """ Лента без раскладки: все посты подписок, сортировка при чтении """
+        posts = feed_posts(author__in=Follow.objects.filter(
+            user=user).values('author')).order_by(*FEED_ORDERING)
+        return CursorPaginator(posts, settings.POSTS_PER_PAGE).get_page(cursor)
+
+    @staticmethod
+    def measure(read, readers, options):
+        """ (время, запросы) каждой страницы: курсор берётся с прошлой """
+        samples = []
+        for user in readers:
+            cursor = None
+            for _ in range(options['pages']):
+                timer = QueryTimer()
+                start = perf_counter()
+                with connection.execute_wrapper(timer):
+                    page = read(user, cursor)
+                samples.append((perf_counter() - start, timer.queries))
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+        return samples
+
+    def report(self, name, samples):
+        seconds = [value for value, _ in samples]
+        queries = sum(count for _, count in samples) / max(len(samples), 1)
+        self.stdout.write(
+            f'{name:>10} {ms(percentile(seconds, 50)):>9} '
+            f'{ms(percentile(seconds, 95)):>9} '
+            f'{ms(percentile(seconds, 99)):>9} {queries:>8.1f}')
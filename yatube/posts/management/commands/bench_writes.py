@@ -0,0 +1,114 @@
+import logging
+import os
+import tempfile
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.bench import benchmark_database, ms, percentile
+from core.writer import stop_write_queue, write_queue
+from posts.models import Group
+from posts.seeding import seed_dataset
+
+MODES = {'direct': False, 'queue': True}
+
+
+class Command(BaseCommand):
+    help = (
+        'Много авторов одновременно создают посты через post_create: '
+        'сразу в базу и через поток-писатель (WRITE_QUEUE). Печатает '
+        'записи в секунду, p50/p99 и долю ошибок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers', type=int, default=32,
+            help='Число одновременных авторов (потоков).')
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько постов создаёт каждый автор.')
+        parser.add_argument(
+            '--modes', nargs='+', choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"mode":>8} {"writes/s":>9} {"p50, ms":>9} {"p99, ms":>9} '
+            f'{"errors":>7} {"batch":>6}')
+        # Ошибки «database is locked» считаются, а не печатаются
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for mode in options['modes']:
+                with tempfile.TemporaryDirectory() as directory:
+                    with benchmark_database(
+                            os.path.join(directory, 'bench.db')):
+                        with override_settings(WRITE_QUEUE=MODES[mode]):
+                            self.report(mode, self.run(options))
+        finally:
+            request_logger.setLevel(level)
+
+    def run(self, options):
+        users, groups = seed_dataset(
+            users=options['writers'], groups=5, posts=1000)
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        url = reverse('posts:post_create')
+        timings = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['writers'] + 1)
+
+        def author(user):
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            local, failed = [], 0
+            barrier.wait()
+            for number in range(options['requests']):
+                start = perf_counter()
+                try:
+                    response = client.post(url, {
+                        'text': f'Пост {number} автора {user.username}',
+                        'group': group_ids[number % len(group_ids)],
+                    })
+                    failed += response.status_code != 302
+                except DatabaseError:
+                    failed += 1
+                local.append(perf_counter() - start)
+            connection.close()
+            with lock:
+                timings.extend(local)
+                errors.append(failed)
+
+        threads = [
+            threading.Thread(target=author, args=(user,)) for user in users
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - start
+        batches = writes = 0
+        if settings.WRITE_QUEUE:
+            queue = write_queue()
+            batches, writes = queue.batches, queue.writes
+            stop_write_queue()
+        return {
+            'throughput': (len(timings) - sum(errors)) / elapsed,
+            'p50': percentile(timings, 50),
+            'p99': percentile(timings, 99),
+            'errors': sum(errors) / max(len(timings), 1),
+            'batch': writes / batches if batches else 1.0,
+        }
+
+    def report(self, mode, result):
+        self.stdout.write(
+            f'{mode:>8} {result["throughput"]:>9.1f} {ms(result["p50"]):>9} '
+            f'{ms(result["p99"]):>9} {result["errors"]:>7.1%} '
+            f'{result["batch"]:>6.1f}')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.caching import card_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Попадания и промахи кэша карточек постов.'
+
+    def handle(self, *args, **options):
+        stats = card_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total * 100 if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1f}%'
+        )
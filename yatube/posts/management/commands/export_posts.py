@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporting import (
+    CHUNK_SIZE, FORMATS, export_filters, export_rows, render_rows
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в JSONL или CSV пачками по id, не загружая '
+        'таблицу в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для выгрузки; «-» — стандартный вывод.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат; по умолчанию — по расширению файла или jsonl.')
+        parser.add_argument('--group', help='Только посты группы (slug).')
+        parser.add_argument('--author', help='Только посты автора.')
+        parser.add_argument(
+            '--since', help='С даты или даты со временем (включительно).')
+        parser.add_argument(
+            '--until', help='До даты или даты со временем (не включая).')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько постов читать одним запросом.')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'csv' if output.endswith('.csv') else 'jsonl'
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным')
+        try:
+            filters = export_filters(
+                group=options['group'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        lines = render_rows(
+            export_rows(filters, options['chunk_size']), fmt)
+        if output == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        written = 0
+        with open(output, 'w', encoding='utf-8', newline='') as stream:
+            for written, line in enumerate(lines, 1):
+                stream.write(line)
+        self.stderr.write(f'Записано строк: {written}')
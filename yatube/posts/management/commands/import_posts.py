@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import FORMATS, PostImporter, read_rows
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля author, text, group, '
+        'pub_date) пачками bulk_create, сохраняя исходные даты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с постами; «-» — стандартный ввод.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию — по расширению.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять за одну транзакцию.')
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'csv' if path.endswith('.csv') else 'jsonl'
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        importer = PostImporter(
+            batch_size=options['batch_size'],
+            create_missing=options['create_missing'],
+            max_errors=MAX_REPORTED_ERRORS,
+        )
+        if path == '-':
+            imported = importer.run(read_rows(sys.stdin, fmt), self.progress)
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(error)
+            with stream:
+                imported = importer.run(
+                    read_rows(stream, fmt), self.progress)
+        for number, error in importer.errors:
+            self.stderr.write(f'Строка {number}: {error}')
+        self.stdout.write(
+            f'Импортировано постов: {imported}, '
+            f'пропущено строк: {importer.error_count}'
+        )
+
+    def progress(self, imported, rate):
+        self.stdout.write(f'{imported} постов, {rate:.0f} строк/с')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_posts
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счётчики постов авторов и групп с таблицей постов.'
+
+    def handle(self, *args, **options):
+        authors_fixed, groups_fixed = recount_posts()
+        self.stdout.write(
+            f'Исправлено счётчиков: авторов — {authors_fixed}, '
+            f'групп — {groups_fixed}'
+        )
@@ -0,0 +1,64 @@
+from datetime import date, datetime, time
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from posts.seeding import BATCH_SIZE, SEED_END, SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу синтетическими пользователями, группами '
+        'и постами. Одинаковый --seed даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель Ципфа для авторов и групп.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--end', type=date.fromisoformat, default=SEED_END.date(),
+            help='Дата (ГГГГ-ММ-ДД), которой заканчивается год постов.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько постов вставлять одним запросом.')
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug групп; для повторного '
+                 'заполнения той же базы нужен новый.')
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        try:
+            users, groups = seed_dataset(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                skew=options['skew'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                prefix=options['prefix'],
+                end=datetime.combine(options['end'], time(), timezone.utc),
+                progress=self.progress(start),
+            )
+        except (IntegrityError, ValueError) as error:
+            raise CommandError(error)
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'Создано пользователей: {len(users)}, групп: {len(groups)}, '
+            f'постов: {options["posts"]} за {elapsed:.1f} с '
+            f'({options["posts"] / elapsed:.0f} постов/с). '
+            f'Пароль пользователей: {SEED_PASSWORD}'
+        )
+
+    def progress(self, start):
+        def report(created):
+            rate = created / (perf_counter() - start)
+            self.stdout.write(f'{created} постов, {rate:.0f} постов/с')
+        return report
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_auto_20261018_0219'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='mod_date',
+            field=models.DateTimeField(auto_now=True, help_text='Заполняется автоматически', verbose_name='Дата изменения'),
+        ),
+        migrations.RunSQL(
+            'UPDATE posts_post SET mod_date = pub_date',
+            migrations.RunSQL.noop,
+        ),
+    ]
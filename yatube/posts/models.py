@@ -24,6 +24,11 @@ class Group(models.Model):
         verbose_name='Описание группы',
         help_text='Введите описание',
     )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -33,6 +38,13 @@ class Group(models.Model):
         """ При печати объекта модели Group выводится поле title """
         return f"{self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """ Запоминает загруженные значения: по ним сигналы видят изменения """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Post(models.Model):
     """ Модель для постов """
@@ -54,6 +66,11 @@ class Post(models.Model):
         auto_now_add=True,
         help_text='Заполняется автоматически',
     )
+    mod_date = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+        help_text='Заполняется автоматически',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -63,9 +80,129 @@ class Post(models.Model):
     )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
         return self.text[:CHAR_LIMIT]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """ Запоминает загруженные значения: по ним сигналы видят изменения """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class AuthorStats(models.Model):
+    """ Денормализованные счётчики автора """
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Автор',
+        related_name='post_stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов',
+        default=0,
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Число подписчиков',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    """ Подписка пользователя на автора """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='follower',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='following',
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow',
+            ),
+        )
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """
+    Пост в ленте подписок пользователя. Записи раскладываются
+    подписчикам при публикации; дата копируется из поста, чтобы
+    страница ленты читалась по одному индексу.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Читатель',
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_post',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_feed_idx',
+            ),
+        )
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
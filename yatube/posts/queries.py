@@ -0,0 +1,24 @@
+from .models import Post
+
+# Поля, которые нужны карточке поста (includes/post_card.html)
+FEED_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'mod_date',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+)
+
+
+def feed_posts(**filters):
+    """ Посты для лент: автор и группа одним JOIN, только нужные поля """
+    return (
+        Post.objects
+        .select_related('author', 'group')
+        .only(*FEED_FIELDS)
+        .filter(**filters)
+    )
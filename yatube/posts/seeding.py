@@ -0,0 +1,317 @@
+import calendar
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from .caching import POSTS_SCOPE, bump_feed_versions
+from .fts import FTS_TABLE, FTS_TRIGGERS
+from .models import AuthorStats, Group, Post, User
+from .timeline import fan_out_since
+
+SEED_PASSWORD = 'bench-password'
+NO_GROUP_SHARE = 0.3
+PERIOD = timedelta(days=365)
+# Конец периода дат постов по умолчанию: фиксирован, чтобы seed
+# задавал и даты
+SEED_END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 100000
+# Пулы, из которых собираются имена и тексты: Faker на каждую
+# строку в сотни раз медленнее вставки
+NAMES_POOL = 500
+CORPUS_PARAGRAPHS = 2000
+# Длина текста поста — логнормальная: медиана ~e**5 ≈ 150 символов
+TEXT_MU = 5.0
+TEXT_SIGMA = 0.9
+TEXT_MIN = 20
+TEXT_MAX = 3000
+TEXT_POOL = 4096
+# Биты seed_mix(n) на выбор автора и группы
+CHOICE_BITS = 20
+# Старшие биты seed_mix(n) — на смещение даты внутри интервала
+DATE_SHIFT = 52
+MASK64 = (1 << 64) - 1
+
+
+def skewed_weights(size, skew):
+    """
+    Накопленные веса по закону Ципфа: первый элемент популярнее
+    второго в 2**skew раз и так далее — как авторы и группы в жизни.
+    """
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+@contextmanager
+def deferred_indexes(model):
+    """
+    Удаляет вторичные индексы таблицы и триггеры FTS5 на время
+    массовой вставки и создаёт их заново в конце: построить индекс
+    один раз быстрее, чем обновлять его на каждой строке.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = %s AND sql IS NOT NULL", [table])
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = %s", [table])
+        triggers = [name for name, in cursor.fetchall()]
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+        last_id = cursor.fetchone()[0]
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        for name in triggers:
+            cursor.execute(f'DROP TRIGGER "{name}"')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+            if any(name.startswith(FTS_TABLE) for name in triggers):
+                # Новые строки — в поисковый индекс одним запросом
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE}(rowid, text) '
+                    f'SELECT id, text FROM {table} WHERE id > %s',
+                    [last_id])
+                for statement in FTS_TRIGGERS:
+                    cursor.execute(statement)
+
+
+class TextSource:
+    """ Тексты постов: куски корпуса Faker случайной длины """
+
+    def __init__(self, fake, rng):
+        self.corpus = ' '.join(fake.paragraphs(CORPUS_PARAGRAPHS))
+        self.rng = rng
+
+    def text(self):
+        length = int(self.rng.lognormvariate(TEXT_MU, TEXT_SIGMA))
+        length = max(TEXT_MIN, min(TEXT_MAX, length))
+        start = self.rng.randrange(len(self.corpus) - length)
+        # Начинаем с целого слова
+        start = self.corpus.find(' ', start) + 1
+        return self.corpus[start:start + length].strip()
+
+
+def _seed_users(fake, rng, users, prefix):
+    last_pk = _last_pk(User)
+    password = make_password(SEED_PASSWORD)
+    first_names = [fake.first_name() for _ in range(NAMES_POOL)]
+    last_names = [fake.last_name() for _ in range(NAMES_POOL)]
+    User.objects.bulk_create(
+        User(
+            username=f'{prefix}{number}',
+            first_name=rng.choice(first_names),
+            last_name=rng.choice(last_names),
+            email=f'{prefix}{number}@example.com',
+            password=password,
+        )
+        for number in range(users)
+    )
+    return _new_pks(User, last_pk)
+
+
+def _seed_groups(fake, groups, prefix):
+    last_pk = _last_pk(Group)
+    Group.objects.bulk_create(
+        Group(
+            title=fake.catch_phrase()[:200],
+            slug=f'{prefix}-group-{number}',
+            description=fake.paragraph(),
+        )
+        for number in range(groups)
+    )
+    return _new_pks(Group, last_pk)
+
+
+def _last_pk(model):
+    return model.objects.order_by('-pk').values_list(
+        'pk', flat=True).first() or 0
+
+
+def _new_pks(model, last_pk):
+    """ bulk_create в SQLite не возвращает pk — читаем новые строки """
+    return list(model.objects.filter(pk__gt=last_pk).order_by(
+        'pk').values_list('pk', flat=True))
+
+
+def _objects(model, pks):
+    if not pks:
+        return []
+    return list(model.objects.filter(pk__gte=pks[0]).order_by('pk'))
+
+
+def _seed_mix(number):
+    """ splitmix64: 63 случайных бита, зависящих только от number """
+    value = (number * 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return (value ^ (value >> 31)) >> 1
+
+
+def _choice_rows(ids, skew, empty_share=0.0):
+    """
+    Строки (порог, id) для выбора по закону Ципфа в SQL: берётся
+    первая строка с порогом не меньше случайного числа из
+    [0, 2**CHOICE_BITS). Первые empty_share значений дают NULL.
+    """
+    scale = 1 << CHOICE_BITS
+    rows = []
+    empty = int(scale * empty_share) if ids else scale
+    if empty:
+        rows.append((empty - 1, None))
+    if ids:
+        weights = skewed_weights(len(ids), skew)
+        span = (scale - empty) / weights[-1]
+        rows.extend(
+            (empty + int(weight * span) - 1, pk)
+            for weight, pk in zip(weights, ids))
+        rows[-1] = (scale - 1, ids[-1])
+    return rows
+
+
+def _date_sql(start, step, bits):
+    """
+    pub_date в формате, в котором Django хранит даты в SQLite:
+    n-й пост попадает в n-й интервал длиной step мкс, так что даты
+    возрастают вместе с id. Смещение в интервале — из старших битов.
+    """
+    offset = f'{bits} / {1 << DATE_SHIFT} * {step} / {1 << (63 - DATE_SHIFT)}'
+    micros = f'({start} + (n - 1) * {step} + {offset})'
+    return (
+        f"strftime('%Y-%m-%d %H:%M:%S', {micros} / 1000000, 'unixepoch') "
+        f"|| CASE WHEN {micros} % 1000000 = 0 THEN '' "
+        f"ELSE printf('.%06d', {micros} % 1000000) END"
+    )
+
+
+@contextmanager
+def _seed_tables(cursor, seed, texts, author_rows, group_rows):
+    """ Временные таблицы текстов и весов и функция seed_mix() """
+    connection.connection.create_function(
+        'seed_mix', 1, lambda number: _seed_mix(number + (seed << 40)),
+        deterministic=True)
+    tables = {
+        'seed_text': ('n', 'text', list(enumerate(texts))),
+        'seed_author': ('cum', 'author_id', author_rows),
+        'seed_group': ('cum', 'group_id', group_rows),
+        'seed_rows': ('n', 'h', []),
+    }
+    for table, (key, value, rows) in tables.items():
+        cursor.execute(
+            f'CREATE TEMP TABLE {table} ({key} INTEGER PRIMARY KEY, {value})')
+        cursor.executemany(f'INSERT INTO {table} VALUES (%s, %s)', rows)
+    try:
+        yield
+    finally:
+        for table in tables:
+            cursor.execute(f'DROP TABLE temp.{table}')
+
+
+def _insert_posts_sql(first, start, step):
+    """
+    Один INSERT ... SELECT на пачку: автор, группа, текст и дата
+    выбираются в SQLite по битам seed_mix(n), без строк в Python.
+    """
+    bits = 1 << CHOICE_BITS
+    return (
+        f'INSERT INTO {Post._meta.db_table} '
+        f'(id, group_id, text, pub_date, mod_date, author_id) '
+        f'SELECT {first} + n, '
+        f'(SELECT group_id FROM seed_group '
+        f'WHERE cum >= h / {bits} % {bits} ORDER BY cum LIMIT 1), '
+        f'(SELECT text FROM seed_text '
+        f'WHERE seed_text.n = h / {bits ** 2} % {TEXT_POOL}), '
+        f'date, date, '
+        f'(SELECT author_id FROM seed_author '
+        f'WHERE cum >= h % {bits} ORDER BY cum LIMIT 1) '
+        f'FROM (SELECT n, h, {_date_sql(start, step, "h")} AS date '
+        f'FROM seed_rows)'
+    )
+
+
+def _timestamp_micros(moment):
+    return calendar.timegm(moment.utctimetuple()) * 10 ** 6
+
+
+def seed_dataset(users=1000, groups=50, posts=20000, skew=1.1, seed=0,
+                 batch_size=BATCH_SIZE, progress=None, prefix='seed',
+                 end=SEED_END):
+    """
+    Заполняет базу правдоподобными данными: у всех пользователей
+    пароль SEED_PASSWORD, посты распределены по авторам и группам
+    по закону Ципфа, а по датам — равномерно за PERIOD до end.
+    Результат зависит только от seed и end. Посты собираются в SQLite
+    запросами INSERT ... SELECT по batch_size строк при отложенных
+    индексах, счётчики и ленты подписчиков обновляются в конце.
+    Возвращает созданных пользователей и группы.
+    """
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    author_ids = _seed_users(fake, rng, users, prefix)
+    if posts and not author_ids:
+        raise ValueError('Для постов нужен хотя бы один автор')
+    group_ids = _seed_groups(fake, groups, prefix)
+    source = TextSource(fake, rng)
+    texts = [source.text() for _ in range(TEXT_POOL)]
+    end = _timestamp_micros(end)
+    start = end - int(PERIOD.total_seconds() * 10 ** 6)
+    step = (end - start) // max(posts, 1)
+    first = _last_pk(Post)
+    with transaction.atomic(), connection.cursor() as cursor:
+        with _seed_tables(
+            cursor, seed, texts,
+            _choice_rows(author_ids, skew),
+            _choice_rows(group_ids, skew, NO_GROUP_SHARE),
+        ), deferred_indexes(Post):
+            insert = _insert_posts_sql(first, start, step)
+            for low in range(0, posts, batch_size):
+                high = min(low + batch_size, posts)
+                cursor.execute('DELETE FROM seed_rows')
+                # Случайные биты считаются один раз на строку
+                cursor.execute(
+                    'WITH RECURSIVE seq(n) AS (SELECT %s UNION ALL '
+                    'SELECT n + 1 FROM seq WHERE n < %s) '
+                    'INSERT INTO seed_rows SELECT n, seed_mix(n) FROM seq',
+                    [low + 1, high])
+                cursor.execute(insert)
+                if progress is not None:
+                    progress(high)
+        _add_counts(cursor, first)
+        fan_out_since(first)
+    bump_feed_versions([POSTS_SCOPE])
+    return _objects(User, author_ids), _objects(Group, group_ids)
+
+
+def _add_counts(cursor, last_id):
+    """ Счётчики новых постов: upsert по авторам, UPDATE по группам """
+    posts = Post._meta.db_table
+    groups = Group._meta.db_table
+    cursor.execute(
+        f'INSERT INTO {AuthorStats._meta.db_table} '
+        f'(author_id, posts_count, followers_count) '
+        f'SELECT author_id, COUNT(*), 0 FROM {posts} WHERE id > %s '
+        f'GROUP BY author_id '
+        f'ON CONFLICT (author_id) DO UPDATE '
+        f'SET posts_count = posts_count + excluded.posts_count',
+        [last_id],
+    )
+    cursor.execute(
+        f'UPDATE {groups} SET posts_count = posts_count + ('
+        f'SELECT COUNT(*) FROM {posts} '
+        f'WHERE group_id = {groups}.id AND id > %s) '
+        f'WHERE id IN (SELECT DISTINCT group_id FROM {posts} WHERE id > %s)',
+        [last_id, last_id],
+    )
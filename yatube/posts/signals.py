@@ -0,0 +1,212 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .caching import (
+    POSTS_SCOPE, author_scope, bump_feed_versions, group_scope,
+    invalidate_cards
+)
+from .counters import (
+    change_author_count, change_followers_count, change_group_count
+)
+from .models import Follow, Group, Post, TimelineEntry, User
+from .timeline import (
+    backfill_followers, backfill_timeline, fan_out, fans_out, followers_count
+)
+
+
+def _bump_feed_versions(scopes):
+    """
+    Версии меняются сразу и ещё раз после COMMIT: запрос, попавший
+    между первой сменой и COMMIT, читает старые строки и кэширует их
+    под промежуточной версией, которую COMMIT делает устаревшей.
+    """
+    scopes = list(scopes)
+    bump_feed_versions(scopes)
+    transaction.on_commit(lambda: bump_feed_versions(scopes))
+
+
+def _invalidate_cards(post_ids):
+    """ Карточки — так же, сразу и после COMMIT """
+    post_ids = list(post_ids)
+    invalidate_cards(post_ids)
+    transaction.on_commit(lambda: invalidate_cards(post_ids))
+
+
+def _invalidate_posts_cards(posts):
+    # id берутся сейчас: после COMMIT постов у группы может не быть
+    _invalidate_cards(posts.values_list('pk', flat=True))
+
+
+def _post_scopes(post, group_ids, old_author_id=None):
+    """ Ленты, на которых виден пост: общая, автора и его групп """
+    slugs = Group.objects.filter(
+        pk__in=[pk for pk in group_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    usernames = [post.author.username]
+    if old_author_id not in (None, post.author_id):
+        usernames.extend(User.objects.filter(
+            pk=old_author_id).values_list('username', flat=True))
+    return [
+        POSTS_SCOPE,
+        *(author_scope(username) for username in usernames),
+        *(group_scope(slug) for slug in slugs),
+    ]
+
+
+def _post_moved(post, old_author_id, old_group_id):
+    """ Правка сменила автора или группу: переносим счётчики и ленты """
+    if old_group_id != post.group_id:
+        change_group_count(old_group_id, -1)
+        change_group_count(post.group_id, 1)
+    if old_author_id != post.author_id:
+        change_author_count(old_author_id, -1)
+        change_author_count(post.author_id, 1)
+        # Пост уходит из лент подписчиков прежнего автора к новым
+        TimelineEntry.objects.filter(post=post).delete()
+        fan_out(post)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    """
+    Новый пост или смена автора или группы меняют счётчики, карточку
+    и ленты
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    old_author_id = loaded.get('author_id', instance.author_id)
+    old_group_id = loaded.get('group_id', instance.group_id)
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        fan_out(instance)
+    else:
+        _post_moved(instance, old_author_id, old_group_id)
+    _bump_feed_versions(_post_scopes(
+        instance, (old_group_id, instance.group_id), old_author_id))
+    instance._loaded_values = {
+        'author_id': instance.author_id,
+        'group_id': instance.group_id,
+    }
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    _invalidate_cards([instance.pk])
+    _bump_feed_versions(_post_scopes(instance, (instance.group_id,)))
+
+
+def _group_scopes(group, *slugs):
+    """ Ленты, на которых видна группа: её страница, общая и авторов """
+    usernames = User.objects.filter(posts__group=group).values_list(
+        'username', flat=True).distinct()
+    return [
+        POSTS_SCOPE,
+        *(group_scope(slug) for slug in slugs),
+        *(author_scope(username) for username in usernames),
+    ]
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    """ Карточки ссылаются на slug группы, страница выводит её описание """
+    if created:
+        _bump_feed_versions([group_scope(instance.slug)])
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    _invalidate_posts_cards(instance.posts.all())
+    _bump_feed_versions(_group_scopes(
+        instance, instance.slug, loaded.get('slug', instance.slug)))
+    instance._loaded_values = {'slug': instance.slug}
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    """ SET_NULL обнуляет группу у постов без сигналов — чистим заранее """
+    _invalidate_posts_cards(instance.posts.all())
+    _bump_feed_versions(_group_scopes(instance, instance.slug))
+
+
+# Поля пользователя, которые выводят карточки и профиль
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _card_fields(user):
+    return tuple(getattr(user, field) for field in AUTHOR_CARD_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+def author_saving(sender, instance, update_fields=None, **kwargs):
+    """ Прежние поля карточки — сравнить с новыми после сохранения """
+    instance._old_card_fields = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not set(update_fields) & set(AUTHOR_CARD_FIELDS)):
+        return
+    instance._old_card_fields = User.objects.filter(
+        pk=instance.pk).values_list(*AUTHOR_CARD_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, **kwargs):
+    """
+    Карточки выводят имя и ФИО автора. Остальные поля — пароль, почта,
+    вход в систему — карточки и ленты не сбрасывают.
+    """
+    if created:
+        _bump_feed_versions([author_scope(instance.username)])
+        return
+    old = getattr(instance, '_old_card_fields', None)
+    if old is None or old == _card_fields(instance):
+        return
+    _invalidate_posts_cards(instance.posts.all())
+    slugs = Group.objects.filter(posts__author=instance).values_list(
+        'slug', flat=True).distinct()
+    old_username = old[0]
+    _bump_feed_versions([
+        POSTS_SCOPE,
+        author_scope(instance.username),
+        author_scope(old_username),
+        *(group_scope(slug) for slug in slugs),
+    ])
+
+
+def _follow_scopes(follow):
+    """ Профиль автора выводит кнопку подписки """
+    usernames = User.objects.filter(pk=follow.author_id).values_list(
+        'username', flat=True)
+    return [author_scope(username) for username in usernames]
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    """ Новая подписка: счётчик и посты автора в ленту — в фоне """
+    if not created:
+        return
+    change_followers_count(instance.author_id, 1)
+    if fans_out(instance.author_id):
+        backfill_timeline.enqueue(
+            user_id=instance.user_id, author_id=instance.author_id)
+    _bump_feed_versions(_follow_scopes(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """
+    Отписка убирает посты автора из ленты подписчика. Автор, у которого
+    подписчиков стало FANOUT_MAX_FOLLOWERS, снова раскладывается:
+    остальным подписчикам в фоне добавляются его посты.
+    """
+    change_followers_count(instance.author_id, -1)
+    if (followers_count(instance.author_id)
+            == settings.FANOUT_MAX_FOLLOWERS):
+        backfill_followers.enqueue(author_id=instance.author_id)
+    TimelineEntry.objects.filter(
+        user_id=instance.user_id, post__author_id=instance.author_id,
+    ).delete()
+    _bump_feed_versions(_follow_scopes(instance))
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..api import API_FIELDS
+from ..counters import recount_posts
+from ..models import Group, Post, User
+
+
+class PostsApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.ALL_POSTS = settings.POSTS_PER_PAGE + 3
+        Post.objects.bulk_create(
+            [Post(author=cls.user, text=f'Пост {i}', group=cls.group)
+             for i in range(cls.ALL_POSTS)]
+        )
+        cls.post = Post.objects.create(author=cls.other, text='Без группы')
+        recount_posts()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_index_walks_with_cursor(self):
+        """Лента отдаёт все поля и листается курсором."""
+        response = self.client.get(reverse('posts:api_index'))
+        data = response.json()
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(data['results']), settings.POSTS_PER_PAGE)
+        self.assertEqual(set(data['results'][0]), set(API_FIELDS))
+        self.assertEqual(data['results'][0]['id'], self.post.pk)
+        self.assertIsNone(data['previous'])
+
+        data = self.client.get(
+            reverse('posts:api_index'), {'cursor': data['next']}).json()
+        self.assertEqual(len(data['results']), 4)
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    def test_sparse_fields(self):
+        """?fields= оставляет только запрошенные поля."""
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=(self.post.pk,)),
+            {'fields': 'id,author,group'},
+        ).json()
+        self.assertEqual(
+            data, {'id': self.post.pk, 'author': 'other', 'group': None})
+
+    def test_unknown_fields(self):
+        """Неизвестное поле — ответ 400 со списком допустимых."""
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['fields'], list(API_FIELDS))
+
+    def test_group_and_profile_feeds(self):
+        """Ленты группы и автора фильтруют посты, чужие адреса — 404."""
+        cases = (
+            ('posts:api_group_list', self.group.slug, 'test-slug'),
+            ('posts:api_profile', self.other.username, None),
+        )
+        for name, arg, group in cases:
+            with self.subTest(name=name):
+                results = self.client.get(
+                    reverse(name, args=(arg,)),
+                    {'fields': 'group'}).json()['results']
+                self.assertTrue(results)
+                self.assertTrue(all(
+                    post['group'] == group for post in results))
+                response = self.client.get(reverse(name, args=('nobody',)))
+                self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=(0,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_one_query_per_feed_page(self):
+        """Страница ленты — один запрос, без COUNT(*) и рендеринга."""
+        with self.assertNumQueries(1):
+            self.client.get(reverse('posts:api_index'))
+
+    def test_etag(self):
+        """Совпавший ETag — ответ 304, после нового поста — 200."""
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,194 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..caching import (
+    POSTS_SCOPE, card_cache_stats, card_key, feed_versions, render_cards
+)
+from ..models import Group, Post, User
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def card(self, **variant):
+        return render_cards(
+            Post.objects.filter(pk=self.post.pk), **variant)[0]
+
+    def test_second_render_is_cache_hit(self):
+        """Повторная лента берёт карточки из кэша."""
+        self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(card_cache_stats(), {'hits': 0, 'misses': 1})
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(card_cache_stats(), {'hits': 1, 'misses': 1})
+        self.assertTemplateNotUsed(response, 'includes/post_card.html')
+        self.assertContains(response, self.post.text)
+
+    def test_variants_are_cached_separately(self):
+        """show_link и author_link дают разные карточки."""
+        with_link = self.card(show_link=True)
+        without_link = self.card()
+        self.assertIn(self.group.slug, with_link)
+        self.assertNotIn(self.group.slug, without_link)
+
+    def test_post_edit_invalidates_card(self):
+        """post_edit обновляет карточку."""
+        self.card()
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        self.assertIn('Новый текст', self.card())
+
+    def test_model_save_invalidates_card(self):
+        """Сохранение через модель (админку) обновляет карточку."""
+        self.card()
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Текст из админки'
+        post.save()
+        self.assertIn('Текст из админки', self.card())
+
+    def test_group_delete_invalidates_card(self):
+        """Удаление группы (SET_NULL) убирает ссылку на неё из карточки."""
+        self.assertIn(self.group.slug, self.card(show_link=True))
+        Group.objects.get(pk=self.group.pk).delete()
+        self.assertNotIn(self.group.slug, self.card(show_link=True))
+
+    def test_author_rename_invalidates_card(self):
+        """Смена имени автора обновляет карточку."""
+        self.assertIn('Лев Толстой', self.card())
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Алексей'
+        author.save()
+        self.assertIn('Алексей Толстой', self.card())
+
+    def test_other_user_fields_keep_cards(self):
+        """Пароль, почта и активность не сбрасывают карточки и ленты."""
+        self.card()
+        versions = feed_versions([POSTS_SCOPE])
+        author = User.objects.get(pk=self.user.pk)
+        author.set_password('новый-пароль')
+        author.email = 'leo@example.com'
+        author.save()
+        author.is_active = False
+        author.save(update_fields=['is_active'])
+        self.assertEqual(feed_versions([POSTS_SCOPE]), versions)
+        self.assertIsNotNone(cache.get(card_key(self.post.pk, False, False)))
+
+
+class FeedPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        cls.index_url = reverse('posts:index')
+        cls.group_url = reverse('posts:group_list', args=(cls.group.slug,))
+        cls.other_group_url = reverse(
+            'posts:group_list', args=(cls.other_group.slug,))
+        cls.profile_url = reverse('posts:profile', args=(cls.user.username,))
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_pages_served_from_cache(self):
+        """Повторный анонимный запрос не обращается к базе."""
+        for url in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованные пользователи получают свежую страницу."""
+        self.authorized_client.get(self.index_url)
+        response = self.authorized_client.get(self.index_url)
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_bumps_its_feeds_only(self):
+        """Новый пост сбрасывает свои ленты и не трогает чужие."""
+        urls = (
+            self.index_url, self.group_url, self.profile_url,
+            self.other_group_url,
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for url in urls[:3]:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.other_group_url)
+
+    def test_group_edit_bumps_group_page(self):
+        """Изменение группы сбрасывает её страницу."""
+        self.guest_client.get(self.group_url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.description = 'Новое описание'
+        group.save()
+        self.assertContains(
+            self.guest_client.get(self.group_url), 'Новое описание')
+
+    def test_group_delete_bumps_feeds(self):
+        """Удаление группы сбрасывает ленты с её постами."""
+        self.guest_client.get(self.index_url)
+        Group.objects.get(pk=self.group.pk).delete()
+        self.assertNotContains(
+            self.guest_client.get(self.index_url), self.group.slug)
+
+
+class CommitOrderTest(TransactionTestCase):
+    """Версии лент меняются ещё раз после COMMIT записи."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.index_url = reverse('posts:index')
+
+    def test_page_read_before_commit_not_served_after(self):
+        """Страница, прочитанная до COMMIT, после него устаревает."""
+        with transaction.atomic():
+            Post.objects.create(author=self.user, text='Новый пост')
+            # Страница, закэшированная конкурентным запросом до COMMIT,
+            # лежит под этой версией
+            version = feed_versions([POSTS_SCOPE])
+            self.client.get(self.index_url)
+        self.assertNotEqual(feed_versions([POSTS_SCOPE]), version)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.index_url)
+        self.assertContains(response, 'Новый пост')
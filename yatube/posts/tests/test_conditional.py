@@ -0,0 +1,121 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='notauth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.feed_urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        self.post_url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_validators_present(self):
+        """Ленты и пост отдают ETag и Last-Modified."""
+        for url in (*self.feed_urls, self.post_url):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_feed_not_modified_without_queries(self):
+        """Совпавший ETag ленты даёт 304 без запросов к базе."""
+        for url in self.feed_urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_gives_304(self):
+        """If-Modified-Since с датой ответа даёт 304."""
+        for url in (*self.feed_urls, self.post_url):
+            with self.subTest(url=url):
+                last_modified = self.guest_client.get(url)['Last-Modified']
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 304)
+
+    def test_post_detail_not_modified_with_one_query(self):
+        """Для поста валидатор строится одним запросом без рендеринга."""
+        etag = self.guest_client.get(self.post_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(
+                self.post_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_post_changes_feed_etag(self):
+        """Новый пост меняет ETag лент."""
+        etags = [self.guest_client.get(url)['ETag'] for url in self.feed_urls]
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group)
+        for url, etag in zip(self.feed_urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_stale_page_keeps_its_validators(self):
+        """Старая страница, пока её пересчитывают, идёт со старым ETag."""
+        url = reverse('posts:index')
+        old = self.guest_client.get(url)
+        Post.objects.create(author=self.user, text='Новый пост')
+        # Страницу пересчитывает другой процесс
+        lock = f'feed_page:{md5(url.encode()).hexdigest()}:lock'
+        cache.add(lock, 'other', 60)
+        stale = self.guest_client.get(url)
+        self.assertNotContains(stale, 'Новый пост')
+        self.assertEqual(stale['ETag'], old['ETag'])
+        self.assertEqual(stale['Last-Modified'], old['Last-Modified'])
+        cache.delete(lock)
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=stale['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый пост')
+
+    def test_post_edit_changes_post_etag(self):
+        """post_edit меняет ETag страницы поста."""
+        etag = self.authorized_client.get(self.post_url)['ETag']
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            data={'text': 'Новый текст', 'group': self.group.pk},
+        )
+        response = self.authorized_client.get(
+            self.post_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый текст')
+
+    def test_etag_depends_on_user(self):
+        """Разные пользователи получают разные ETag."""
+        other_client = Client()
+        other_client.force_login(self.other_user)
+        for url in (*self.feed_urls, self.post_url):
+            with self.subTest(url=url):
+                self.assertNotEqual(
+                    self.authorized_client.get(url)['ETag'],
+                    other_client.get(url)['ETag'],
+                )
@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import author_posts_count
+from ..models import AuthorStats, Group, Post, User
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assert_counts(self, author, group, other_group):
+        self.user.refresh_from_db()
+        self.assertEqual(author_posts_count(self.user), author)
+        self.assertEqual(
+            Group.objects.get(pk=self.group.pk).posts_count, group)
+        self.assertEqual(
+            Group.objects.get(pk=self.other_group.pk).posts_count,
+            other_group
+        )
+
+    def test_create_increments_counters(self):
+        """post_create увеличивает счётчики автора и группы."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Тестовый пост', 'group': self.group.pk},
+        )
+        self.assert_counts(1, 1, 0)
+
+    def test_edit_moves_group_counter(self):
+        """Смена группы в post_edit переносит счётчик."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': 'Новый текст', 'group': self.other_group.pk},
+        )
+        self.assert_counts(1, 0, 1)
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': 'Без группы'},
+        )
+        self.assert_counts(1, 0, 0)
+
+    def test_author_change_moves_counters_and_feeds(self):
+        """Смена автора (например, в админке) переносит счётчик и ленты."""
+        cache.clear()
+        other = User.objects.create_user(username='other')
+        post = Post.objects.create(
+            author=self.user, text='Чужой пост', group=self.group)
+        old_profile = reverse('posts:profile', args=(self.user.username,))
+        self.assertContains(Client().get(old_profile), 'Чужой пост')
+        post = Post.objects.get(pk=post.pk)
+        post.author = other
+        post.save()
+        self.assert_counts(0, 1, 0)
+        self.assertEqual(author_posts_count(other), 1)
+        self.assertNotContains(Client().get(old_profile), 'Чужой пост')
+
+    def test_delete_decrements_counters(self):
+        """Удаление поста уменьшает счётчики."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        post.delete()
+        self.assert_counts(0, 0, 0)
+
+    def test_recount_fixes_drift(self):
+        """recount_posts исправляет рассинхронизацию."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Тестовый пост', group=self.group)
+            for _ in range(3)
+        ])
+        self.assert_counts(0, 0, 0)
+        out = StringIO()
+        call_command('recount_posts', stdout=out)
+        self.assertIn('авторов — 1, групп — 1', out.getvalue())
+        self.assert_counts(3, 3, 0)
+
+    def test_pages_show_counter(self):
+        """Профиль и пост выводят значение счётчика."""
+        post = Post.objects.create(author=self.user, text='Тестовый пост')
+        AuthorStats.objects.filter(author=self.user).update(posts_count=42)
+        urls = (
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(post.pk,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.context['posts_count'], 42)
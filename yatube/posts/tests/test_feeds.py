@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост в группе', group=cls.group)
+        cls.other_post = Post.objects.create(
+            author=User.objects.create_user(username='other'),
+            text='Пост без группы',
+        )
+        # адрес: (тип содержимого, есть ли пост без группы)
+        cls.feeds = {
+            reverse('posts:index_rss'): ('application/rss+xml', True),
+            reverse('posts:index_atom'): ('application/atom+xml', True),
+            reverse('posts:group_list_rss', args=('test-slug',)):
+                ('application/rss+xml', False),
+            reverse('posts:group_list_atom', args=('test-slug',)):
+                ('application/atom+xml', False),
+            reverse('posts:profile_rss', args=('auth',)):
+                ('application/rss+xml', False),
+            reverse('posts:profile_atom', args=('auth',)):
+                ('application/atom+xml', False),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds(self):
+        """Ленты отдают XML с постами своей области."""
+        for url, (content_type, site_wide) in self.feeds.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type))
+                self.assertContains(response, 'Пост в группе')
+                self.assertEqual(
+                    'Пост без группы' in response.content.decode(),
+                    site_wide
+                )
+
+    def test_unknown_group_and_author(self):
+        """Несуществующие группа и автор — 404."""
+        for name, arg in (('group_list_rss', 'nope'), ('profile_atom', 'x')):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse(f'posts:{name}', args=(arg,)))
+                self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get_without_database(self):
+        """Повторный опрос с ETag получает 304 без запросов к базе."""
+        url = reverse('posts:group_list_atom', args=('test-slug',))
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_until_post_changes(self):
+        """XML берётся из кэша, пока пост области не изменится."""
+        url = reverse('posts:index_rss')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertContains(self.client.get(url), 'Исправленный пост')
@@ -0,0 +1,173 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.jobs import claim, run_jobs
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+
+class FollowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.other = User.objects.create_user(username='other')
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.other_client = Client()
+        self.other_client.force_login(self.other)
+
+    def follow(self, client=None, author=None):
+        return (client or self.reader_client).post(reverse(
+            'posts:profile_follow', args=((author or self.author).username,)))
+
+    def feed(self, client=None, **params):
+        response = (client or self.reader_client).get(
+            reverse('posts:follow_index'), params)
+        return [post.text for post in response.context['page_obj']]
+
+    def followers(self):
+        return AuthorStats.objects.get(author=self.author).followers_count
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка меняют связь и счётчик подписчиков."""
+        self.assertRedirects(
+            self.follow(), reverse('posts:profile', args=('author',)))
+        self.follow()
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.followers(), 1)
+        response = self.reader_client.get(
+            reverse('posts:profile', args=('author',)))
+        self.assertTrue(response.context['following'])
+        self.reader_client.post(
+            reverse('posts:profile_unfollow', args=('author',)))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.followers(), 0)
+
+    def test_cannot_follow_self_or_as_guest(self):
+        """На себя не подписаться, гостя отправляют на вход."""
+        self.follow(author=self.reader)
+        response = Client().post(
+            reverse('posts:profile_follow', args=('author',)))
+        self.assertRedirects(
+            response,
+            reverse('users:login') + '?next='
+            + reverse('posts:profile_follow', args=('author',)))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_requires_post_with_csrf(self):
+        """GET не меняет подписки, POST без токена CSRF отклоняется."""
+        url = reverse('posts:profile_follow', args=('author',))
+        self.assertEqual(self.reader_client.get(url).status_code, 405)
+        csrf_client = Client(enforce_csrf_checks=True)
+        csrf_client.force_login(self.reader)
+        csrf_client.post(url)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_fanned_out_to_followers(self):
+        """Новый пост попадает в ленту подписчика, но не остальных."""
+        self.follow()
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.feed(), ['Новый пост'])
+        self.assertEqual(self.feed(self.other_client), [])
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 1)
+
+    def test_follow_backfills_timeline(self):
+        """Старые посты автора добавляет в ленту фоновая задача."""
+        Post.objects.create(author=self.author, text='Старый пост')
+        self.follow()
+        self.assertEqual(self.feed(), [])
+        run_jobs(claim('test', ['timeline']))
+        self.assertEqual(self.feed(), ['Старый пост'])
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора уходят из ленты."""
+        self.follow()
+        Post.objects.create(author=self.author, text='Пост')
+        self.reader_client.post(
+            reverse('posts:profile_unfollow', args=('author',)))
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_author_change_moves_post_between_timelines(self):
+        """Пост со сменённым автором переезжает к его подписчикам."""
+        self.follow()
+        self.follow(self.other_client, self.reader)
+        post = Post.objects.create(author=self.author, text='Пост')
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.reader
+        post.save()
+        self.assertEqual(self.feed(), [])
+        self.assertEqual(self.feed(self.other_client), ['Пост'])
+
+    def test_popular_author_merged_at_read_time(self):
+        """Посты автора с большим числом подписчиков не раскладываются."""
+        self.follow()
+        Post.objects.create(author=self.author, text='Разложенный')
+        self.follow(self.other_client)
+        with override_settings(FANOUT_MAX_FOLLOWERS=1):
+            Post.objects.create(author=self.author, text='Подмешанный')
+            self.assertEqual(TimelineEntry.objects.count(), 1)
+            self.assertEqual(self.feed(), ['Подмешанный', 'Разложенный'])
+            self.assertEqual(
+                self.feed(self.other_client), ['Подмешанный', 'Разложенный'])
+
+    @override_settings(FANOUT_MAX_FOLLOWERS=1)
+    def test_author_fanned_out_again_after_unfollow(self):
+        """Подписчиков снова не больше порога — посты в ленты в фоне."""
+        self.follow()
+        self.follow(self.other_client)
+        run_jobs(claim('test', ['timeline']))
+        Post.objects.create(author=self.author, text='Подмешанный')
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.other_client.post(
+            reverse('posts:profile_unfollow', args=('author',)))
+        run_jobs(claim('test', ['timeline']))
+        self.assertEqual(self.feed(), ['Подмешанный'])
+        self.assertEqual(TimelineEntry.objects.count(), 1)
+
+    @override_settings(POSTS_PER_PAGE=3)
+    def test_feed_pages(self):
+        """Курсоры листают ленту из обоих источников без повторов."""
+        popular = User.objects.create_user(username='popular')
+        self.follow()
+        self.follow(author=popular)
+        self.follow(self.other_client, popular)
+        with override_settings(FANOUT_MAX_FOLLOWERS=1):
+            for number in range(8):
+                Post.objects.create(
+                    author=(self.author, popular)[number % 2],
+                    text=f'Пост {number}')
+            response = self.reader_client.get(reverse('posts:follow_index'))
+            texts = [post.text for post in response.context['page_obj']]
+            while response.context['page_obj'].has_next():
+                cursor = response.context['page_obj'].next_cursor
+                response = self.reader_client.get(
+                    reverse('posts:follow_index'), {'cursor': cursor})
+                texts += [post.text for post in response.context['page_obj']]
+            self.assertEqual(
+                texts, [f'Пост {number}' for number in range(7, -1, -1)])
+            previous = response.context['page_obj'].previous_cursor
+            self.assertEqual(
+                self.feed(cursor=previous), ['Пост 4', 'Пост 3', 'Пост 2'])
+
+    def test_backfill_command(self):
+        """Команда заполняет ленты после записи в обход сигналов."""
+        Follow.objects.bulk_create([
+            Follow(user=self.reader, author=self.author)])
+        Post.objects.bulk_create([
+            Post(author=self.author, text=f'Пост {number}')
+            for number in range(3)])
+        out = StringIO()
+        call_command('backfill_timelines', stdout=out)
+        self.assertIn('Заполнено по подпискам: 1', out.getvalue())
+        self.assertEqual(len(self.feed()), 3)
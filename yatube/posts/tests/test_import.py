@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..counters import author_posts_count
+from ..importing import PostImporter, read_rows
+from ..models import Follow, Group, Post, TimelineEntry, User
+from ..search import SearchResults
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_file(self, content, suffix='.jsonl', **options):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, encoding='utf-8', delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.unlink, file.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', file.name, stdout=out, stderr=err,
+                     **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_jsonl_keeps_dates_and_counters(self):
+        """JSONL: исходные даты сохраняются, счётчики сдвигаются."""
+        rows = [
+            {'author': 'auth', 'text': f'Импорт {i}', 'group': 'test-slug',
+             'pub_date': f'2020-01-0{i + 1}T12:00:00Z'}
+            for i in range(5)
+        ]
+        out, _ = self.import_file(
+            '\n'.join(json.dumps(row) for row in rows), batch_size=2)
+        self.assertIn('Импортировано постов: 5', out)
+        self.assertEqual(
+            list(Post.objects.values_list('pub_date', flat=True))[-1],
+            datetime(2020, 1, 1, 12, tzinfo=timezone.utc)
+        )
+        self.assertEqual(Post.objects.get(text='Импорт 0').mod_date,
+                         datetime(2020, 1, 1, 12, tzinfo=timezone.utc))
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(author_posts_count(user), 5)
+        self.assertEqual(SearchResults('импорт').count(), 5)
+
+    def test_csv_and_bad_rows(self):
+        """CSV: неполные строки и неизвестные авторы пропускаются."""
+        content = (
+            'author,text,group,pub_date\n'
+            'auth,Первый пост,,2021-05-01 10:00:00\n'
+            'ghost,Чужой пост,,\n'
+            'auth,,,\n'
+            'auth,Плохая дата,,вчера\n'
+            'auth,Пост в группе,test-slug,\n'
+        )
+        out, err = self.import_file(content, suffix='.csv')
+        self.assertIn('Импортировано постов: 2, пропущено строк: 3', out)
+        self.assertIn('Строка 3: нет автора ghost', err)
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Первый пост', 'Пост в группе'}
+        )
+
+    def test_wrong_types_rejected(self):
+        """Поля не тех типов отклоняются, импорт не падает."""
+        rows = [
+            {'author': ['auth'], 'text': 'Список'},
+            {'author': 'auth', 'text': 'Число', 'pub_date': 20200101},
+            {'author': 'auth', 'text': 'Группа', 'group': {'slug': 'x'}},
+            {'author': 'auth', 'text': 'Хороший'},
+        ]
+        out, err = self.import_file('\n'.join(map(json.dumps, rows)))
+        self.assertIn('Импортировано постов: 1, пропущено строк: 3', out)
+        self.assertIn('Строка 1: поле author должно быть строкой', err)
+        self.assertIn('Строка 2: поле pub_date должно быть строкой', err)
+
+    def test_invalid_names_not_created(self):
+        """--create-missing не создаёт имён и slug, которых нет в адресах."""
+        rows = [
+            {'author': 'auth', 'text': 'Пробел', 'group': 'My Group'},
+            {'author': 'a/b', 'text': 'Слэш'},
+            {'author': 'auth', 'text': 'Длинный', 'group': 'x' * 101},
+        ]
+        out, err = self.import_file(
+            '\n'.join(map(json.dumps, rows)), create_missing=True)
+        self.assertIn('Импортировано постов: 0, пропущено строк: 3', out)
+        self.assertIn("Строка 1: неверное поле slug 'My Group'", err)
+        self.assertIn("Строка 2: неверное поле username 'a/b'", err)
+        self.assertFalse(Group.objects.exclude(pk=self.group.pk).exists())
+        self.assertFalse(User.objects.filter(username='a/b').exists())
+        self.assertEqual(self.client.get('/').status_code, 200)
+
+    def test_errors_are_bounded(self):
+        """Хранятся первые ошибки, остальные только считаются."""
+        importer = PostImporter(max_errors=2)
+        importer.run(read_rows(StringIO('[]\n' * 5), 'jsonl'))
+        self.assertEqual(importer.error_count, 5)
+        self.assertEqual(
+            importer.errors, [(1, 'ожидался объект JSON'),
+                              (2, 'ожидался объект JSON')])
+
+    def test_fanned_out_to_followers(self):
+        """Импортированные посты попадают в ленты подписчиков."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        rows = [{'author': 'auth', 'text': f'Импорт {i}'} for i in range(3)]
+        self.import_file('\n'.join(map(json.dumps, rows)), batch_size=2)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=reader).count(), 3)
+
+    def test_create_missing(self):
+        """--create-missing создаёт авторов и группы."""
+        row = {'author': 'newbie', 'text': 'Привет', 'group': 'new-group'}
+        self.import_file(json.dumps(row), create_missing=True)
+        post = Post.objects.select_related('author', 'group').get()
+        self.assertEqual(post.author.username, 'newbie')
+        self.assertFalse(post.author.has_usable_password())
+        self.assertEqual(post.group.slug, 'new-group')
+        self.assertEqual(post.group.posts_count, 1)
+
+    def test_auto_now_add_restored(self):
+        """После импорта pub_date снова заполняется автоматически."""
+        self.import_file(json.dumps({
+            'author': 'auth', 'text': 'Старый',
+            'pub_date': '2000-01-01T00:00',
+        }))
+        post = Post.objects.create(author=self.user, text='Новый')
+        self.assertGreater(post.pub_date.year, 2000)
@@ -0,0 +1,93 @@
+from django.db import connection
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..counters import recount_posts
+from ..models import Group, Post, User
+
+
+def query_plan(sql):
+    """Строки EXPLAIN QUERY PLAN для запроса SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(plan):
+    """Полные сканы таблиц и сортировки во временном B-дереве."""
+    return [
+        line for line in plan
+        if 'TEMP B-TREE' in line
+        or (line.startswith('SCAN') and 'USING' not in line)
+    ]
+
+
+class FeedQueryPlanTest(TestCase):
+    """Каждый запрос лент к posts_post обслуживается индексом."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(author=cls.user, text=f'Тестовый пост {i}',
+                  group=cls.group if i % 2 else None)
+                for i in range(30)]
+        )
+        # bulk_create не вызывает сигналы — сверяем счётчики
+        recount_posts()
+        cls.feed_urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.user.username,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def feed_queries(self, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.guest_client.get(url, data)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_post' in query['sql']
+        ]
+        self.assertTrue(queries)
+        return response, queries
+
+    def assert_indexed(self, queries):
+        for sql in queries:
+            with self.subTest(sql=sql):
+                self.assertEqual(plan_problems(query_plan(sql)), [])
+
+    def test_page_queries_use_indexes(self):
+        """Нумерованные страницы лент не сканируют и не сортируют."""
+        for url in self.feed_urls:
+            for page in (1, 2):
+                _, queries = self.feed_queries(url, {'page': page})
+                self.assert_indexed(queries)
+
+    def test_cursor_queries_use_indexes(self):
+        """Keyset-страницы в обе стороны не сканируют и не сортируют."""
+        for url in self.feed_urls:
+            response, queries = self.feed_queries(url, {'cursor': ''})
+            self.assert_indexed(queries)
+            cursor = response.context['page_obj'].next_cursor
+            response, queries = self.feed_queries(url, {'cursor': cursor})
+            self.assert_indexed(queries)
+            cursor = response.context['page_obj'].previous_cursor
+            _, queries = self.feed_queries(url, {'cursor': cursor})
+            self.assert_indexed(queries)
+
+    def test_harness_detects_missing_index(self):
+        """Проверка замечает сортировку без подходящего индекса."""
+        plan = query_plan('SELECT id FROM posts_post ORDER BY text')
+        self.assertNotEqual(plan_problems(plan), [])
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import recount_posts
+from ..models import Group, Post, User
+
+
+class FeedQueryBudgetTest(TestCase):
+    """Число SQL-запросов на страницу не зависит от числа постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+        cls.authors = [
+            User.objects.create_user(
+                username=f'author{i}', first_name='Имя', last_name=str(i))
+            for i in range(5)
+        ]
+        Post.objects.bulk_create(
+            [Post(author=cls.authors[i % 5], text=f'Тестовый пост {i}',
+                  group=cls.group)
+                for i in range(15)]
+        )
+        # bulk_create не вызывает сигналы — сверяем счётчики
+        recount_posts()
+        cls.author = cls.authors[0]
+        cls.post = Post.objects.filter(author=cls.author).first()
+        # url: (гость, авторизованный); сессия и пользователь
+        # авторизованного берутся из кэша
+        cls.budgets = {
+            reverse('posts:index'): (2, 2),
+            reverse('posts:group_list', args=(cls.group.slug,)): (2, 2),
+            reverse('posts:profile', args=(cls.author.username,)): (2, 2),
+            # + запрос версии поста для ETag
+            reverse('posts:post_detail', args=(cls.post.pk,)): (2, 2),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_guest_query_budget(self):
+        """Бюджет запросов для гостя."""
+        for url, (budget, _) in self.budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.guest_client.get(url)
+
+    def test_authorized_query_budget(self):
+        """Бюджет запросов для авторизованного пользователя."""
+        # Первый запрос кладёт пользователя в кэш
+        self.authorized_client.get(reverse('about:author'))
+        for url, (_, budget) in self.budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.authorized_client.get(url)
+
+    def test_second_page_query_budget(self):
+        """Вторая страница ленты укладывается в тот же бюджет."""
+        url = reverse('posts:index')
+        budget, _ = self.budgets[url]
+        with self.assertNumQueries(budget):
+            self.guest_client.get(url, {'page': 2})
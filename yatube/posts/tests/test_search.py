@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, User
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+        return response, [post.pk for post in response.context['page_obj']]
+
+    def test_created_post_is_found(self):
+        """Пост из post_create сразу находится, слово подсвечено."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Рецепт борща со сметаной'},
+        )
+        response, found = self.search('борщ')
+        self.assertEqual(found, [Post.objects.get().pk])
+        self.assertContains(response, '<mark>борща</mark>')
+
+    def test_edit_updates_index(self):
+        """post_edit обновляет индекс."""
+        post = Post.objects.create(author=self.user, text='Старый текст')
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': 'Обновлённый текст'},
+        )
+        self.assertEqual(self.search('старый')[1], [])
+        self.assertEqual(self.search('обновлённый')[1], [post.pk])
+
+    def test_delete_updates_index(self):
+        """Удалённый пост не находится."""
+        post = Post.objects.create(author=self.user, text='Удаляемый пост')
+        post.delete()
+        self.assertEqual(self.search('удаляемый')[1], [])
+
+    def test_bulk_create_is_indexed(self):
+        """Индекс ведут триггеры, поэтому bulk_create тоже попадает."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Массовый пост {i}')
+            for i in range(3)
+        ])
+        self.assertEqual(len(self.search('массовый')[1]), 3)
+
+    def test_ranking(self):
+        """Более релевантный пост выше."""
+        weak = Post.objects.create(
+            author=self.user, text='Кот и длинный рассказ про собаку')
+        strong = Post.objects.create(author=self.user, text='Кот кот кот')
+        self.assertEqual(self.search('кот')[1], [strong.pk, weak.pk])
+
+    def test_snippet_is_escaped(self):
+        """Фрагмент экранирует HTML пользователя."""
+        Post.objects.create(
+            author=self.user, text='<script>alert(1)</script> опасный')
+        response, _ = self.search('опасный')
+        self.assertNotContains(response, '<script>')
+        self.assertContains(response, '&lt;script&gt;')
+
+    def test_pagination_keeps_query(self):
+        """Ссылки пагинатора сохраняют запрос."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Страничный пост {i}')
+            for i in range(settings.POSTS_PER_PAGE + 2)
+        ])
+        response, found = self.search('страничный', page=2)
+        self.assertEqual(len(found), 2)
+        self.assertContains(response, 'href="?q=%D1%81%D1%82')
+
+    def test_empty_and_syntax_queries(self):
+        """Пустой запрос и спецсимволы FTS не ломают поиск."""
+        Post.objects.create(author=self.user, text='Обычный пост')
+        for query in ('', '"', 'AND OR NOT', '*', 'обычный)'):
+            with self.subTest(query=query):
+                response, _ = self.search(query)
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через FTS5, а не LIKE."""
+        post = Post.objects.create(author=self.user, text='Админский пост')
+        Post.objects.create(author=self.user, text='Другой пост')
+        client = Client()
+        client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                reverse('admin:posts_post_changelist'), {'q': 'админский'})
+        self.assertEqual(
+            [obj.pk for obj in response.context['cl'].result_list],
+            [post.pk]
+        )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+
+from ..counters import recount_posts
+from ..models import Post
+from ..seeding import seed_dataset
+
+
+class SeedDatasetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seeded_dataset(self):
+        """Данные неравномерны по авторам, счётчики сходятся."""
+        users, groups = seed_dataset(
+            users=20, groups=5, posts=600, batch_size=250)
+        self.assertEqual(len(users), 20)
+        self.assertEqual(len(groups), 5)
+        self.assertEqual(Post.objects.count(), 600)
+        per_author = sorted(
+            Post.objects.order_by().values('author')
+            .annotate(n=Count('id'))
+            .values_list('n', flat=True), reverse=True)
+        self.assertGreater(per_author[0], 3 * per_author[len(per_author) // 2])
+        self.assertTrue(Post.objects.filter(group=None).exists())
+        self.assertGreater(
+            Post.objects.values('pub_date__date').distinct().count(), 100)
+        self.assertEqual(recount_posts(), (0, 0))
+        self.assertTrue(users[0].check_password('bench-password'))
+
+    def test_same_seed_same_posts(self):
+        """Одинаковый seed даёт одинаковые посты в любой день запуска."""
+        def posts(prefix):
+            seed_dataset(users=5, groups=2, posts=50, seed=7, prefix=prefix)
+            return list(Post.objects.filter(
+                author__username__startswith=prefix).order_by('pk')
+                .values_list('text', 'group__title', 'author__first_name',
+                             'pub_date'))
+
+        first = posts('first')
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch.object(timezone, 'now', return_value=tomorrow):
+            self.assertEqual(posts('second'), first)
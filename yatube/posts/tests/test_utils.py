@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from ..caching import POSTS_SCOPE
+from ..models import Group, Post, User
+from ..utils import ELLIPSIS, CursorPage, ElidedPaginator, paginate
+
+
+class CursorPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='noname')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug_slug',
+            description='Тестовое описание',
+        )
+        cls.ALL_POSTS = 23
+        Post.objects.bulk_create(
+            [Post(author=cls.user, text=f'Тестовый пост {i}', group=cls.group)
+                for i in range(cls.ALL_POSTS)]
+        )
+        cls.expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get_page(self, cursor=''):
+        request = self.factory.get('/', {'cursor': cursor})
+        return paginate(Post.objects.all(), request)
+
+    def test_cursor_param_switches_mode(self):
+        """Параметр cursor включает keyset-пагинацию."""
+        page = self.get_page()
+        self.assertIsInstance(page, CursorPage)
+        self.assertEqual(len(page), settings.POSTS_PER_PAGE)
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_walk_forward_and_back(self):
+        """Проход вперёд и назад возвращает все посты по порядку."""
+        pages = [self.get_page()]
+        while pages[-1].has_next():
+            pages.append(self.get_page(pages[-1].next_cursor))
+        ids = [post.id for page in pages for post in page]
+        self.assertEqual(ids, self.expected_ids)
+        self.assertFalse(pages[-1].has_next())
+
+        page = pages[-1]
+        backward = []
+        while page.has_previous():
+            page = self.get_page(page.previous_cursor)
+            backward.append([post.id for post in page])
+        self.assertEqual(
+            backward, [[post.id for post in p] for p in pages[-2::-1]])
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор отдаёт первую страницу."""
+        page = self.get_page('not-a-cursor')
+        self.assertEqual(
+            [post.id for post in page],
+            self.expected_ids[:settings.POSTS_PER_PAGE]
+        )
+
+    def test_feed_views_support_cursor(self):
+        """Все ленты принимают параметр cursor."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        client = Client()
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url, {'cursor': ''})
+                page = response.context['page_obj']
+                self.assertIsInstance(page, CursorPage)
+                self.assertContains(response, page.next_cursor)
+
+
+class ElidedPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='noname')
+        cls.PAGES = 50
+        Post.objects.bulk_create(
+            [Post(author=cls.user, text=f'Тестовый пост {i}')
+                for i in range(cls.PAGES * settings.POSTS_PER_PAGE)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_page_windows(self):
+        """Окно номеров на первой, средней и последней странице."""
+        paginator = ElidedPaginator(range(500), 10)
+        cases = {
+            1: [1, 2, 3, ELLIPSIS, 50],
+            4: [1, 2, 3, 4, 5, 6, ELLIPSIS, 50],
+            25: [1, ELLIPSIS, 23, 24, 25, 26, 27, ELLIPSIS, 50],
+            47: [1, ELLIPSIS, 45, 46, 47, 48, 49, 50],
+            50: [1, ELLIPSIS, 48, 49, 50],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    paginator.get_elided_page_range(number), expected)
+        self.assertEqual(
+            ElidedPaginator(range(70), 10).get_elided_page_range(4),
+            list(range(1, 8))
+        )
+
+    def test_template_renders_window(self):
+        """Шаблон выводит окно, а не все страницы."""
+        for number in (1, self.PAGES // 2, self.PAGES):
+            with self.subTest(number=number):
+                response = self.client.get(
+                    reverse('posts:index'), {'page': number})
+                self.assertEqual(response.context['page_obj'].number, number)
+                self.assertContains(response, ELLIPSIS)
+                # Ссылки на последнюю: номер в окне и «Последняя»
+                self.assertContains(
+                    response, f'?page={self.PAGES}"',
+                    count=0 if number == self.PAGES else 2)
+                self.assertLessEqual(
+                    response.content.decode().count('page-item'), 13)
+
+    def test_count_is_cached(self):
+        """COUNT(*) берётся из кэша, новая версия ленты его обновляет."""
+        request = RequestFactory().get('/')
+        queryset = Post.objects.all()
+        paginate(queryset, request, scope=POSTS_SCOPE)
+        with self.assertNumQueries(0):
+            page = paginate(queryset, request, scope=POSTS_SCOPE)
+            self.assertEqual(
+                page.paginator.count, self.PAGES * settings.POSTS_PER_PAGE)
+        Post.objects.create(author=self.user, text='Новый пост')
+        page = paginate(queryset, request, scope=POSTS_SCOPE)
+        self.assertEqual(
+            page.paginator.count, self.PAGES * settings.POSTS_PER_PAGE + 1)
+
+    @override_settings(POSTS_COUNT_TIMEOUT=0)
+    def test_count_staleness_bound(self):
+        """Запись в обход сигналов видна после POSTS_COUNT_TIMEOUT."""
+        request = RequestFactory().get('/')
+        paginate(Post.objects.all(), request, scope=POSTS_SCOPE)
+        Post.objects.bulk_create([Post(author=self.user, text='Тихий пост')])
+        page = paginate(Post.objects.all(), request, scope=POSTS_SCOPE)
+        self.assertEqual(
+            page.paginator.count, self.PAGES * settings.POSTS_PER_PAGE + 1)
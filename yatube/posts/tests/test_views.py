@@ -1,10 +1,12 @@
 from math import ceil
 
 from django import forms
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.conf import settings
 
+from ..counters import recount_posts
 from ..forms import PostForm
 from ..models import Group, Post, User
 
@@ -153,8 +155,12 @@ class PaginatorViewsTest(TestCase):
             [Post(author=cls.user, text=f"Тестовый пост {i}", group=cls.group)
                 for i in range(cls.ALL_POSTS)]
         )
+        # bulk_create не вызывает сигналы — сверяем счётчики
+        recount_posts()
 
     def setUp(self):
+        # bulk_create не меняет версии лент — страницы из кэша неактуальны
+        cache.clear()
         self.guest_client = Client()
         self.pagin_urls = (
             reverse('posts:index'),
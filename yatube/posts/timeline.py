@@ -0,0 +1,168 @@
+from heapq import merge
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from core.jobs import task
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .queries import feed_posts
+from .utils import PREVIOUS, CursorPaginator, decode_cursor
+
+
+def followers_count(author_id):
+    return AuthorStats.objects.filter(author_id=author_id).values_list(
+        'followers_count', flat=True).first() or 0
+
+
+def fans_out(author_id):
+    """ Посты автора раскладываются по лентам подписчиков """
+    return followers_count(author_id) <= settings.FANOUT_MAX_FOLLOWERS
+
+
+def _fan_out(condition, params):
+    stats = AuthorStats._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            f'(user_id, post_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.pub_date '
+            f'FROM {Post._meta.db_table} AS post '
+            f'JOIN {Follow._meta.db_table} AS follow '
+            f'ON follow.author_id = post.author_id '
+            f'WHERE {condition} AND COALESCE(('
+            f'SELECT followers_count FROM {stats} '
+            f'WHERE {stats}.author_id = post.author_id), 0) <= %s '
+            f'ON CONFLICT DO NOTHING',
+            [*params, settings.FANOUT_MAX_FOLLOWERS],
+        )
+        return cursor.rowcount
+
+
+def fan_out(post):
+    """
+    Раскладывает новый пост по лентам подписчиков автора одним
+    INSERT ... SELECT. Посты авторов, у которых подписчиков больше
+    FANOUT_MAX_FOLLOWERS, не раскладываются. Возвращает число записей.
+    """
+    return _fan_out('post.id = %s', [post.pk])
+
+
+def fan_out_since(last_id):
+    """
+    fan_out для всех постов с id больше last_id — после массовой
+    вставки (bulk_create, INSERT ... SELECT), которая не вызывает
+    сигналов. Уже разложенные посты пропускаются.
+    """
+    return _fan_out('post.id > %s', [last_id])
+
+
+@task(queue='timeline')
+def backfill_timeline(user_id, author_id):
+    """
+    Последние TIMELINE_BACKFILL_POSTS постов автора — в ленту
+    подписчика. Уже разложенные посты пропускаются, так что задачу
+    можно повторять.
+    """
+    if not (Follow.objects.filter(user_id=user_id, author_id=author_id)
+            .exists() and fans_out(author_id)):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id').values_list('pk', 'pub_date')[
+            :settings.TIMELINE_BACKFILL_POSTS]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@task(queue='timeline')
+def backfill_followers(author_id):
+    """
+    Автор снова раскладывается по лентам: его посты, вышедшие, пока
+    подписчиков было больше FANOUT_MAX_FOLLOWERS, подмешивались при
+    чтении и иначе пропали бы из лент. Каждому подписчику — как при
+    новой подписке.
+    """
+    user_ids = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True)
+    for user_id in user_ids:
+        backfill_timeline(user_id=user_id, author_id=author_id)
+
+
+def _after(position, id_field):
+    """ Ключи источника за позицией курсора в сторону его направления """
+    direction, pub_date, pk = position
+    if direction == PREVIOUS:
+        return Q(pub_date__gte=pub_date) & ~Q(
+            pub_date=pub_date, **{f'{id_field}__lte': pk})
+    return Q(pub_date__lte=pub_date) & ~Q(
+        pub_date=pub_date, **{f'{id_field}__gte': pk})
+
+
+class TimelinePaginator(CursorPaginator):
+    """
+    Лента подписок по ключу (pub_date, id): записи ленты пользователя
+    сливаются с постами авторов, которые не раскладываются. Из каждого
+    источника читается не больше страницы ключей, затем посты
+    страницы берутся одним запросом.
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(None, per_page)
+        self.user = user
+
+    def sources(self):
+        """ (queryset, поле id) источников ленты """
+        yield TimelineEntry.objects.filter(user=self.user), 'post_id'
+        yield Post.objects.filter(
+            author__following__user=self.user,
+            author__post_stats__followers_count__gt=(
+                settings.FANOUT_MAX_FOLLOWERS),
+        ), 'id'
+
+    def keys(self, position, backward):
+        """ До per_page + 1 ключей (pub_date, id) после позиции """
+        order = '' if backward else '-'
+        streams = []
+        for queryset, id_field in self.sources():
+            if position is not None:
+                queryset = queryset.filter(_after(position, id_field))
+            streams.append(
+                queryset.order_by(f'{order}pub_date', f'{order}{id_field}')
+                .values_list('pub_date', id_field)[:self.per_page + 1]
+            )
+        merged = merge(*streams, reverse=not backward)
+        # Пост, разложенный до того, как автор перестал раскладываться,
+        # приходит из двух источников
+        return list(islice(_unique(merged), self.per_page + 1))
+
+    def posts(self, keys):
+        posts = feed_posts(pk__in=[pk for _, pk in keys]).in_bulk()
+        return [posts[pk] for _, pk in keys if pk in posts]
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor) if cursor else None
+        backward = position is not None and position[0] == PREVIOUS
+        keys = self.keys(position, backward)
+        extra = len(keys) > self.per_page
+        keys = keys[:self.per_page]
+        if backward:
+            posts = self.posts(keys[::-1])
+            return self._page(posts, bool(posts), extra)
+        posts = self.posts(keys)
+        return self._page(posts, extra, position is not None and bool(posts))
+
+
+def _unique(keys):
+    """ Убирает повторы подряд из упорядоченных ключей """
+    previous = None
+    for key in keys:
+        if key != previous:
+            yield key
+        previous = key
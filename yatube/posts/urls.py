@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
@@ -9,6 +9,47 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow',
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow',
+    ),
+    path('search/', views.search, name='search'),
+    path('export/', views.export, name='export'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_list_rss'),
+    path(
+        'group/<slug:slug>/atom/', feeds.group_atom, name='group_list_atom'),
+    path(
+        'profile/<str:username>/rss/', feeds.profile_rss, name='profile_rss'),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_atom',
+    ),
+    path('api/v1/posts/', api.api_index, name='api_index'),
+    path(
+        'api/v1/group/<slug:slug>/posts/',
+        api.api_group_posts,
+        name='api_group_list',
+    ),
+    path(
+        'api/v1/profile/<str:username>/posts/',
+        api.api_profile,
+        name='api_profile',
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.api_post_detail,
+        name='api_post_detail',
+    ),
 ]
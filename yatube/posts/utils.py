@@ -1,8 +1,176 @@
-from django.core.paginator import Paginator
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+
+from django.core.paginator import Page, Paginator
 from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .caching import cached_count
+
+FEED_ORDERING = ('-pub_date', '-id')
+CURSOR_PARAM = 'cursor'
+NEXT = 'n'
+PREVIOUS = 'p'
+# Окно номеров страниц: соседи текущей и страницы у краёв
+PAGES_ON_EACH_SIDE = 2
+PAGES_ON_ENDS = 1
+ELLIPSIS = '…'
+
+
+def encode_cursor(post, direction):
+    """ Курсор — позиция поста в ленте по ключу (pub_date, id) """
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """ Разбирает курсор, для битого курсора возвращает None """
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """ Страница keyset-пагинации: без COUNT(*) и без OFFSET """
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """ Пагинатор по ключу (pub_date, id) в порядке убывания """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self._forward(self.queryset, has_previous=False)
+        direction, pub_date, pk = position
+        if direction == NEXT:
+            queryset = self.queryset.filter(
+                Q(pub_date__lte=pub_date) & ~Q(pub_date=pub_date, id__gte=pk)
+            )
+            return self._forward(queryset, has_previous=True)
+        queryset = self.queryset.filter(
+            Q(pub_date__gte=pub_date) & ~Q(pub_date=pub_date, id__lte=pk)
+        )
+        return self._backward(queryset)
+
+    def _forward(self, queryset, has_previous):
+        posts = list(
+            queryset.order_by(*FEED_ORDERING)[:self.per_page + 1]
+        )
+        has_next = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        return self._page(posts, has_next, has_previous and bool(posts))
+
+    def _backward(self, queryset):
+        posts = list(
+            queryset.order_by('pub_date', 'id')[:self.per_page + 1]
+        )
+        has_previous = len(posts) > self.per_page
+        posts = posts[:self.per_page][::-1]
+        return self._page(posts, bool(posts), has_previous)
+
+    def _page(self, posts, has_next, has_previous):
+        return CursorPage(
+            posts,
+            next_cursor=encode_cursor(posts[-1], NEXT) if has_next else None,
+            previous_cursor=(
+                encode_cursor(posts[0], PREVIOUS) if has_previous else None
+            ),
+        )
+
+
+class ElidedPage(Page):
+    """ Страница со свёрнутым списком номеров для шаблона """
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class ElidedPaginator(Paginator):
+    """ Paginator, который выводит не все номера страниц, а окно """
+    ELLIPSIS = ELLIPSIS
+
+    def get_elided_page_range(self, number, on_each_side=PAGES_ON_EACH_SIDE,
+                              on_ends=PAGES_ON_ENDS):
+        """
+        Номера страниц вокруг number и у краёв, пропуски — ELLIPSIS:
+        1 … 48 49 50 51 52 … 5000.
+        """
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2 + 1:
+            return list(self.page_range)
+        pages = []
+        left = max(1, number - on_each_side)
+        right = min(num_pages, number + on_each_side)
+        if left > on_ends + 2:
+            pages.extend(range(1, on_ends + 1))
+            pages.append(ELLIPSIS)
+        else:
+            left = 1
+        pages.extend(range(left, right + 1))
+        if right < num_pages - on_ends - 1:
+            pages.append(ELLIPSIS)
+            pages.extend(range(num_pages - on_ends + 1, num_pages + 1))
+        else:
+            pages.extend(range(right + 1, num_pages + 1))
+        return pages
+
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
 
 
-def paginate(queryset, request):
-    paginator = Paginator(queryset, settings.POSTS_PER_PAGE)
+def paginate(queryset, request, mode=None, count=None, scope=None):
+    """
+    Страница ленты. В режиме 'cursor' (или при ?cursor= в запросе)
+    возвращает CursorPage, иначе — страницу ElidedPaginator.
+    count — известное заранее число постов (счётчик); без него
+    COUNT(*) берётся из кэша, версия которого — версия области scope.
+    """
+    mode = mode or settings.POSTS_PAGINATION_MODE
+    if mode == 'cursor' or CURSOR_PARAM in request.GET:
+        paginator = CursorPaginator(queryset, settings.POSTS_PER_PAGE)
+        return paginator.get_page(request.GET.get(CURSOR_PARAM))
+    paginator = ElidedPaginator(queryset, settings.POSTS_PER_PAGE)
+    paginator.count = (
+        cached_count(queryset, scope) if count is None else count)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
@@ -1,31 +1,54 @@
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+
+from core.writer import run_write
 
+from .caching import (
+    AUTHOR_SCOPE, GROUP_SCOPE, POSTS_SCOPE, cache_page_for_guests,
+    conditional_feed, conditional_post
+)
+from .counters import author_posts_count
+from .exporting import (
+    CONTENT_TYPES, FORMATS, export_filters, export_rows, render_rows
+)
 from .forms import PostForm
-from .models import Group, Post, User
-from .utils import paginate
+from .models import Follow, Group, Post, User
+from .queries import feed_posts
+from .search import SearchResults
+from .timeline import TimelinePaginator
+from .utils import CURSOR_PARAM, ElidedPaginator, paginate
 
 User = get_user_model()
 
 
+@conditional_feed(POSTS_SCOPE)
+@cache_page_for_guests(POSTS_SCOPE)
 def index(request):
     """ Возвращает главную страницу """
     template = 'posts/index.html'
-    posts = Post.objects.all()
-    paginator = paginate(posts, request)
+    posts = feed_posts()
+    paginator = paginate(posts, request, scope=POSTS_SCOPE)
     context = {
         'page_obj': paginator,
     }
     return render(request, template, context)
 
 
+@conditional_feed(GROUP_SCOPE)
+@cache_page_for_guests(GROUP_SCOPE)
 def group_posts(request, slug):
     """ Посты, отфильтрованные по группам """
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = paginate(posts, request)
+    posts = feed_posts(group=group)
+    paginator = paginate(posts, request, count=group.posts_count)
     context = {
         'group': group,
         'page_obj': paginator,
@@ -33,29 +56,81 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@conditional_feed(AUTHOR_SCOPE)
+@cache_page_for_guests(AUTHOR_SCOPE)
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = paginate(posts, request)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username)
+    posts_count = author_posts_count(author)
+    posts = feed_posts(author=author)
+    paginator = paginate(posts, request, count=posts_count)
+    following = (
+        request.user.is_authenticated and request.user != author
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
     context = {
         'author': author,
+        'posts_count': posts_count,
         'page_obj': paginator,
+        'following': following,
     }
     return render(request, template, context)
 
 
+@conditional_post
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('group', 'author__post_stats'),
+        pk=post_id,
+    )
     author = post.author
     context = {
         'post': post,
         'author': author,
+        'posts_count': author_posts_count(author),
     }
     return render(request, template, context)
 
 
+def search(request):
+    """ Полнотекстовый поиск по постам """
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = ElidedPaginator(
+        SearchResults(query), settings.POSTS_PER_PAGE)
+    context = {
+        'query': query,
+        'page_query': f'q={quote(query)}&' if query else '',
+        'page_obj': paginator.get_page(request.GET.get('page')),
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def export(request):
+    """ Потоковая выгрузка постов в JSONL или CSV для сотрудников """
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат')
+    try:
+        filters = export_filters(
+            group=request.GET.get('group'),
+            author=request.GET.get('author'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        render_rows(export_rows(filters), fmt),
+        content_type=f'{CONTENT_TYPES[fmt]}; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="posts.{fmt}"'
+    return response
+
+
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
@@ -63,7 +138,7 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        run_write(post.save)
         return redirect('posts:profile', post.author)
     context = {
         'form': form,
@@ -80,7 +155,7 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id)
     form = PostForm(request.POST or None, instance=post)
     if form.is_valid():
-        form.save()
+        run_write(form.save)
         return redirect('posts:post_detail', post.pk)
     context = {
         'form': form,
@@ -88,3 +163,33 @@ def post_edit(request, post_id):
         'post': post,
     }
     return render(request, template, context)
+
+
+@login_required
+def follow_index(request):
+    """ Посты авторов, на которых подписан пользователь """
+    template = 'posts/follow.html'
+    paginator = TimelinePaginator(request.user, settings.POSTS_PER_PAGE)
+    context = {
+        'page_obj': paginator.get_page(request.GET.get(CURSOR_PARAM)),
+    }
+    return render(request, template, context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        run_write(lambda: Follow.objects.get_or_create(
+            user=request.user, author=author))
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    run_write(lambda: Follow.objects.filter(
+        user=request.user, author=author).delete())
+    return redirect('posts:profile', username)
@@ -10,7 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -51,6 +57,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -85,12 +95,87 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Профиль соединений с SQLite выбирается переменной окружения
+# DATABASE_PROFILE. PRAGMA ставятся на каждое новое соединение
+# (core.db.apply_pragmas), CONN_MAX_AGE оставляет соединение открытым
+# между запросами.
+DATABASE_PROFILES = {
+    'development': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+    },
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': {
+            # Читатели не ждут писателя, писатель не ждёт читателей
+            'journal_mode': 'WAL',
+            # Ждать блокировку записи, а не падать с «database is locked»
+            'busy_timeout': 5000,
+            # В режиме WAL безопасно: теряются лишь последние транзакции
+            # при отключении питания, но не целостность базы
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            # Отрицательное значение — в килобайтах: 64 МБ на соединение
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+if DATABASE_PROFILE not in DATABASE_PROFILES:
+    raise ImproperlyConfigured(
+        f'Неизвестный DATABASE_PROFILE: {DATABASE_PROFILE}')
+SQLITE_PRAGMAS = DATABASE_PROFILES[DATABASE_PROFILE]['PRAGMAS']
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': DATABASE_PROFILES[DATABASE_PROFILE]['CONN_MAX_AGE'],
     }
 }
+# Реплики только для чтения: пути к файлам через os.pathsep. Их
+# обновляет manage.py replicate, читают безопасные запросы
+# (core.routers, core.middleware.ReplicaMiddleware)
+DATABASE_REPLICAS = [
+    path for path in os.environ.get('DATABASE_REPLICAS', '').split(os.pathsep)
+    if path
+]
+for number, path in enumerate(DATABASE_REPLICAS, 1):
+    DATABASES[f'replica{number}'] = dict(
+        DATABASES['default'], NAME=path, TEST={'MIRROR': 'default'})
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Как часто manage.py replicate копирует базу в реплики, секунды
+REPLICA_SYNC_INTERVAL = 2
+# Сколько клиент после записи читает из основной базы
+REPLICA_PIN_COOKIE = 'read_primary'
+REPLICA_PIN_SECONDS = 30
+# Время последней записи в основную базу из любого процесса: реплики,
+# скопированные раньше, не читаются
+REPLICA_LAST_WRITE_FILE = DATABASES['default']['NAME'] + '.written'
+
+# Кэш общий для всех процессов сайта и команд manage.py: сессии,
+# пользователь запроса, версии лент, блокировки пересчёта (core.cache)
+# и время последней записи (core.routers). Кэш в памяти процесса
+# (LocMemCache) не годится: запись в одном процессе не сбрасывала бы
+# данные в других. Несколько машин — общий memcached
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+# Тесты (manage.py test, pytest) не должны видеть кэш сайта и прошлых
+# прогонов: их база каждый раз новая
+if sys.argv[1:2] == ['test'] or 'pytest' in sys.modules:
+    CACHE_DIR = tempfile.mkdtemp(prefix='yatube-test-cache-')
+    atexit.register(shutil.rmtree, CACHE_DIR, True)
+CACHES = {
+    'default': {
+        'BACKEND': 'core.filecache.SharedFileCache',
+        'LOCATION': CACHE_DIR,
+        # Карточки постов (по 4 варианта), страницы лент, сессии
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
 
 
 # Password validation
@@ -131,14 +216,70 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Хэши содержимого в именах, готовые .gz/.br и раздача статики самим
+# приложением (core.storage, core.middleware.StaticFilesMiddleware).
+# Включается переменной окружения, нужен manage.py collectstatic
+STATIC_PIPELINE = bool(os.environ.get('STATIC_PIPELINE'))
+if STATIC_PIPELINE:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+# Кэширование статики без хэша в имени, секунды
+STATIC_MAX_AGE = 60 * 60
+# Ответы короче не сжимаются: выигрыш меньше цены
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_CACHE_TIMEOUT = 60 * 15
 
 LOGIN_URL = 'users:login'
+# Сессии и пользователь запроса читаются из кэша, сессии пишутся и в
+# базу (cached_db); пользователь сбрасывается сигналами core.signals
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма уходят из фоновой очереди (manage.py run_worker) через
+# JOBS_EMAIL_BACKEND, запросы их не ждут
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+JOBS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 POSTS_PER_PAGE = 10
+FEED_ITEMS = 20
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+FEED_PAGE_CACHE_TIMEOUT = 60 * 15
+# Сколько отдавать устаревшее значение, пока его пересчитывают
+CACHE_STALE_TIMEOUT = 60
+CACHE_LOCK_TIMEOUT = 10
+# 'page' — нумерованные страницы, 'cursor' — keyset-пагинация
+POSTS_PAGINATION_MODE = 'page'
+# Насколько может устареть число постов в пагинаторе после записи
+# в обход сигналов
+POSTS_COUNT_TIMEOUT = 60
+# Границы корзин гистограммы времени ответа, секунды
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Каталог снимков метрик процессов WSGI; без него — только свой процесс
+METRICS_SNAPSHOT_DIR = os.environ.get('METRICS_SNAPSHOT_DIR')
+METRICS_SNAPSHOT_INTERVAL = 10
+# /metrics/ без входа сотрудника: сборщик передаёт заголовок
+# Authorization: Bearer <METRICS_TOKEN>. Без токена — только сотрудники
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Фоновые задачи (core.jobs): сколько брать за раз, попытки и паузы
+# между ними (растут вдвое), сколько задача считается занятой
+JOBS_BATCH_SIZE = 50
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+JOBS_RETRY_MAX_DELAY = 60 * 60
+JOBS_LEASE = 5 * 60
+JOBS_POLL_INTERVAL = 1
+# Записи постов через один поток-писатель с group commit (core.writer)
+WRITE_QUEUE = bool(os.environ.get('WRITE_QUEUE'))
+WRITE_QUEUE_MAX_BATCH = 100
+# Лента подписок (posts.timeline): посты авторов, у которых подписчиков
+# не больше FANOUT_MAX_FOLLOWERS, раскладываются по лентам при
+# публикации, остальные подмешиваются при чтении. При подписке в ленту
+# фоновой задачей добавляются последние TIMELINE_BACKFILL_POSTS постов
+FANOUT_MAX_FOLLOWERS = 1000
+TIMELINE_BACKFILL_POSTS = 200
 ALL_POSTS = 13
 POSTS_ON_SECOND_PAGE = 3
 CHAR_LIMIT = 15